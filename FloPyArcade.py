@@ -14,19 +14,29 @@ from flopy.modflow import ModflowOc, ModflowPcg, ModflowWel
 from flopy.modpath import Modpath, ModpathBas
 from flopy.plot import PlotMapView
 from flopy.utils import CellBudgetFile, HeadFile, PathlineFile
-from imageio import get_writer, imread
+from imageio import get_writer
+from io import BytesIO
 from matplotlib.cm import get_cmap
+from matplotlib.collections import LineCollection
 from matplotlib.pyplot import Circle, close, figure, pause, show
 from matplotlib.pyplot import waitforbuttonpress
-from numpy import add, arange, argmax, argsort, array, ceil, copy, divide
-from numpy import extract, float32, int32, linspace, max, maximum, min, minimum
-from numpy import mean, ones, shape, sqrt, sum, zeros
-from numpy.random import randint, random, randn, uniform
+# registering the 3d projection used by render3d
+from mpl_toolkits.mplot3d import Axes3D
+from numpy import add, arange, argmax, argsort, array, asarray, ceil, clip
+from numpy import column_stack, concatenate, copy, cos, count_nonzero, cumsum
+from numpy import diff, empty, float32, frombuffer, full, hypot, int8
+from numpy import int32, isnan, linspace, load as numpyLoad, save as numpySave
+from numpy import max, mean, meshgrid, min, multiply, nan, ones, outer, pi
+from numpy import ravel, repeat, reshape, savez, searchsorted, shape, sin
+from numpy import sqrt, subtract, sum, uint8, where, zeros
+from numpy.random import default_rng, randint, random, randn, uniform
 from numpy.random import seed as numpySeed
-from os import environ, listdir, makedirs, remove, rmdir
-from os.path import abspath, dirname, exists, join
+from os import environ, makedirs, remove
+from os.path import abspath, dirname, exists, getmtime, join
 from platform import system
+from shutil import copyfile, disk_usage, rmtree
 from sys import modules
+from tempfile import mkdtemp
 from time import sleep, time
 
 # suppressing TensorFlow output on import, except fatal errors
@@ -36,27 +46,191 @@ environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 getLogger('tensorflow').setLevel(FATAL)
 
 # additional imports for agents
-from collections import deque, defaultdict
+from atexit import register as atexitRegister
+from atexit import unregister as atexitUnregister
+from collections import defaultdict, deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from gc import collect as garbageCollect
-from itertools import count
+from itertools import chain, count
+from numba import njit, prange
 from pathos.pools import _ProcessPool as Pool
-from pathos.pools import _ThreadPool as ThreadPool
-from pickle import dump, load
+from pickle import dump, load, HIGHEST_PROTOCOL
 from tensorflow.keras.initializers import glorot_uniform
 from tensorflow.keras.layers import Activation, BatchNormalization, Dense
 from tensorflow.keras.layers import Dropout
-from tensorflow.keras.models import clone_model, load_model, model_from_json
-from tensorflow.keras.models import save_model
+from tensorflow.keras.models import load_model, model_from_json
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.optimizers import Adam
 from random import sample as randomSample, seed as randomSeed
+from tensorflow import config as tfConfig
+from tensorflow import concat as tfConcat, where as tfWhere
+from tensorflow import function as tfFunction, TensorSpec
 from tensorflow.compat.v1 import ConfigProto, set_random_seed
 from tensorflow.compat.v1 import Session as TFSession
 from tensorflow.compat.v1.keras import backend as K
-from tensorflow.keras.models import load_model as TFload_model
+from tensorflow.lite import Interpreter, Optimize, TFLiteConverter
+from tensorflow.math import is_nan as tfIsNan
 from tqdm import tqdm
 from uuid import uuid4
+from weakref import WeakKeyDictionary, ref
+
+# models built per architecture within each process, as parallel workers
+# load many agents differing only in weights
+agentModelsCache = {}
+# raw weights of parent agents, as each worker mutates many children of few
+# parents, bounded in size as workers are recycled regularly
+parentWeightsCache = {}
+# compiled predict functions of models queried one input at a time
+agentPredictsCache = WeakKeyDictionary()
+# steady-state solutions per seed and settings, as many environments are
+# initialized identically, e.g. for every agent of a genetic generation,
+# bounded as least recently used, as each holds several full head fields
+steadyStateCache = OrderedDict()
+steadyStateCacheSize = 16
+# surrogate models per path, shared by all surrogate environments of a process
+# as they are only used for prediction
+surrogateModelsCache = {}
+# quantized surrogate models per path, converted once per process
+surrogateQuantizedCache = {}
+# compiled weighted predictions of surrogate ensembles per member paths
+surrogateEnsemblePredictsCache = {}
+# compiled chained heads and particle predictions per surrogate models
+surrogateTransientPredictsCache = {}
+# operating system determining simulator executables, queried once
+operatingSystem = system()
+# temporary model folders of environments in this process, removed at exit
+# if games are not concluded, except in pool workers exiting without handlers
+modelWorkspaces = set()
+
+
+def removeModelWorkspaces():
+    """Remove temporary model folders remaining at exit."""
+    for modelpth in list(modelWorkspaces):
+        rmtree(modelpth, ignore_errors=True)
+    modelWorkspaces.clear()
+
+
+atexitRegister(removeModelWorkspaces)
+
+
+def initializeWorkerCPU():
+    """Restrict TensorFlow in a parallel worker to a single CPU thread.
+
+    Agent networks are small enough for per-call overhead on a GPU to
+    dominate, and many workers claiming all GPU memory and CPU threads
+    would compete with each other. Genetic optimisation therefore runs
+    CPU-only.
+    Note: The limits only take effect if TensorFlow was not yet initialized
+    in the worker. Workers forked from a process that already ran TensorFlow
+    keep its devices and thread pools, which is reported.
+    """
+    # read by TensorFlow when initializing, if not yet done in this process
+    environ['CUDA_VISIBLE_DEVICES'] = ''
+    environ['TF_NUM_INTEROP_THREADS'] = '1'
+    environ['TF_NUM_INTRAOP_THREADS'] = '1'
+    try:
+        tfConfig.experimental.set_visible_devices([], 'GPU')
+    except RuntimeError:
+        print('Worker keeps GPU devices, as TensorFlow was initialized.')
+    try:
+        tfConfig.threading.set_inter_op_parallelism_threads(1)
+    except RuntimeError:
+        print('Worker keeps inter-op threads, as TensorFlow was initialized.')
+    try:
+        tfConfig.threading.set_intra_op_parallelism_threads(1)
+    except RuntimeError:
+        print('Worker keeps intra-op threads, as TensorFlow was initialized.')
+
+
+@njit(cache=True)
+def cellFromCoordinates(x, y, z, minX, minY, zBot, dCol, dRow, dVer, nLay,
+    nRow, nCol):
+    """Determine layer, column and row corresponding to model location."""
+
+    layer = int(ceil((z + zBot) / dVer))
+    column = int(ceil((x + minX) / dCol))
+    row = int(ceil((y + minY) / dRow))
+
+    # clamping in cases where coordinates are 0 or slightly exceeding
+    # boundaries (e.g. rounding or inaccurate surrogate prediction)
+    layer = 1 if layer < 1 else (nLay if layer > nLay else layer)
+    column = 1 if column < 1 else (nCol if column > nCol else column)
+    row = 1 if row < 1 else (nRow if row > nRow else row)
+
+    return layer, column, row
+
+
+@njit(cache=True)
+def gameTermination(particleX, particleY, particleAfterX, particleAfterY,
+    wellX, wellY, minX, minY, extentX, extentY, dCol, dRow, wellRadiusSquared,
+    checkNorth, done, timeStep, maxSteps):
+    """Check if a game ends after a step of the particle.
+
+    Returns whether the game is done and whether the reward of the game is
+    lost. The well is compared by squared distance to avoid a square root.
+    """
+
+    # checking if particle is within horizontal distance of well
+    dx = particleX - wellX
+    # why would the correction for Y coordinate be necessary
+    dy = extentY - particleY - wellY
+    if dx*dx + dy*dy <= wellRadiusSquared:
+        return True, True
+
+    # checking if particle has returned to western boundary
+    if particleAfterX <= minX + dCol:
+        return True, True
+
+    # checking if particle has reached northern boundary
+    if checkNorth and particleAfterY >= minY + extentY - dRow:
+        return True, True
+
+    # checking if particle has reached southern boundary
+    if particleAfterY <= minY + dRow:
+        return True, True
+
+    # checking if particle has reached eastern boundary, only ending the game
+    # once no other check loses the reward
+    if particleAfterX >= minX + extentX - dCol:
+        return True, False
+
+    # aborting game if a threshold of steps have been taken
+    if timeStep == maxSteps and not done:
+        return True, True
+
+    return done, False
+
+
+@njit(parallel=True, cache=True)
+def noveltiesFromActions(agentIdxs, actions, actionsLengths):
+    """Calculate average novelty of given agents in an archive of agents.
+
+    Novelty per pair of agents is the sum over games of the fraction of
+    differing actions along the shorter of both action sequences, averaged
+    over all other agents in the archive. Actions are expected as padded
+    array of action indices with shape (agents, games, steps), along with
+    the number of actions per agent and game.
+    """
+
+    nItems, nGames = actionsLengths.shape
+    novelties = zeros(len(agentIdxs))
+    for i in prange(len(agentIdxs)):
+        iAgent = agentIdxs[i]
+        noveltySum = 0.
+        for iAgent2 in range(nItems):
+            if iAgent2 != iAgent:
+                for g in range(nGames):
+                    lenShorter = actionsLengths[iAgent, g]
+                    if actionsLengths[iAgent2, g] < lenShorter:
+                        lenShorter = actionsLengths[iAgent2, g]
+                    diffsCount = 0
+                    for t in range(lenShorter):
+                        if actions[iAgent, g, t] != actions[iAgent2, g, t]:
+                            diffsCount += 1
+                    noveltySum += diffsCount / lenShorter
+        novelties[i] = noveltySum / (nItems - 1)
+
+    return novelties
 
 
 class FloPyAgent():
@@ -76,12 +250,17 @@ class FloPyAgent():
 
         # initializing arguments
         self.observationsVector = observationsVector
+        self.observationsShape = shape(self.observationsVector)
+        # input of single queried states, allocated on first query
+        self.stateBuffer = None
         self.actionSpace = actionSpace
         self.actionSpaceSize = len(self.actionSpace)
         self.hyParams, self.envSettings = hyParams, envSettings
         self.agentMode = mode
         self.maxTasksPerWorker, self.zFill = maxTasksPerWorker, zFill
         self.maxTasksPerWorkerMutate = maxTasksPerWorkerMutate
+        # process pools are created on first use and reused thereafter
+        self.processPools = {}
 
         # setting seeds
         if self.envSettings is not None:
@@ -126,22 +305,36 @@ class FloPyAgent():
                 self.hyParams = self.pickleLoad(join(self.tempModelpth,
                     self.envSettings['MODELNAME'] + '_hyParams.p'))
 
-    def initializeDQNAgent(self):
-        """Initialize agent to perform Deep Double Q-Learning.
-
-        Bug fix for predict function:
-        https://github.com/keras-team/keras/issues/6462
+    def __getstate__(self):
+        """Return picklable state, as process pools cannot be transferred to
+        parallel workers.
         """
+        state = self.__dict__.copy()
+        state['processPools'] = {}
+        return state
+
+    def initializeDQNAgent(self):
+        """Initialize agent to perform Deep Double Q-Learning."""
 
         # initializing main predictive and target model
+        # note: models are queried by direct calls, so no predict function
+        # needs to be built beforehand
         self.mainModel = self.createNNModel()
-        self.mainModel._make_predict_function()
         self.targetModel = self.createNNModel()
-        self.targetModel._make_predict_function()
         self.targetModel.set_weights(self.mainModel.get_weights())
-
-        # initializing array with last training data of specified length
-        self.replayMemory = deque(maxlen=self.hyParams['REPLAYMEMORYSIZE'])
+        self.mainPredict = self.compilePredictFunction(self.mainModel)
+        self.targetPredict = self.compilePredictFunction(self.targetModel)
+
+        # initializing arrays with last training data of specified length
+        # stored per quantity and written to as ring buffer
+        nMemory = self.hyParams['REPLAYMEMORYSIZE']
+        nObservations = len(self.observationsVector)
+        self.replayStates = zeros((nMemory, nObservations), dtype=float32)
+        self.replayActions = zeros(nMemory, dtype=int32)
+        self.replayRewards = zeros(nMemory, dtype=float32)
+        self.replayNewStates = zeros((nMemory, nObservations), dtype=float32)
+        self.replayDones = zeros(nMemory, dtype=bool)
+        self.replayMemoryCursor, self.replayMemoryCount = 0, 0
         self.epsilon = self.hyParams['EPSILONINITIAL']
 
         # initializing counter for updates on target network
@@ -188,7 +381,8 @@ class FloPyAgent():
                 # overwriting simulation memory to zero if no success
                 # to test: is it better to give reward an not reset to 0?
                 self.gameReward = 0.0
-                self.updateReplayMemoryZeroReward(self.gameStep) # is this better on or off?
+                # gameStep counts from 1, so a game of n steps ends at n+1
+                self.updateReplayMemoryZeroReward(self.gameStep - 1) # is this better on or off?
             gameRewards.append(self.gameReward)
 
             # cross validation, after every given number of games
@@ -206,9 +400,11 @@ class FloPyAgent():
                     self.mainModel.save(join(self.wrkspc, 'models', DQNfstring))
 
             # decaying epsilon
-            if self.epsilon > self.hyParams['EPSILONMIN']:
+            epsilonMin = self.hyParams['EPSILONMIN']
+            if self.epsilon > epsilonMin:
                 self.epsilon *= self.hyParams['EPSILONDECAY']
-                self.epsilon = max([self.hyParams['EPSILONMIN'], self.epsilon])
+                if self.epsilon < epsilonMin:
+                    self.epsilon = epsilonMin
 
     def runGenetic(self, env, noveltySearch=False):
         """Run main pipeline for genetic agent optimisation.
@@ -223,10 +419,13 @@ class FloPyAgent():
         if noveltySearch:
             self.noveltySearch, self.noveltyArchive = noveltySearch, {}
             self.noveltyItemCount = 0
-            self.agentsUnique, self.agentsUniqueIDs = [], []
+            self.agentsUnique, self.agentsUniqueIDs = [], set()
             self.agentsDuplicate = []
             self.actionsUniqueIDMapping = defaultdict(count().__next__)
-        cores = self.envSettings['NAGENTSPARALLEL']
+            self.noveltyActions, self.noveltyActionsLengths = self.encodeNoveltyActions([])
+            # novelties, model files and action IDs per archived agent
+            self.novelties, self.noveltyFilenames = zeros(0), []
+            self.noveltyUniqueIDs = zeros(0, dtype=int32)
         # generating unique process ID from system time
         self.pid = str(uuid4())
 
@@ -249,21 +448,43 @@ class FloPyAgent():
                 if self.noveltySearch:
                     # regenerating list of unique and duplicate agents
                     # in case of resume
+                    actionsArchive, self.noveltyFilenames = [], []
+                    uniqueIDsArchive, actionsGenerations = [], {}
                     for iAgent in range(self.noveltyItemCount):
-                        agentStr = 'agent' + str(iAgent+1)
-                        # self.noveltyArchive[agentStr] = {}
-                        tempAgentPrefix = self.noveltyArchive[agentStr]['modelFile'].replace('.h5', '')
-                        pth = join(tempAgentPrefix + '_results.p')
-                        actions = self.pickleLoad(pth)['actions']
-                        actionsAll = [action for actions_ in actions for action in actions_]
-                        actionsUniqueID = self.actionsUniqueIDMapping[tuple(actionsAll)]
-                        self.noveltyArchive[agentStr]['actionsUniqueID'] = actionsUniqueID
+                        entry = self.noveltyArchive['agent' + str(iAgent+1)]
+                        modelFile = entry['modelFile']
+                        # loading actions of all agents of a generation once
+                        tempAgentPrefix = modelFile.replace('.npz', '').replace(
+                            '.h5', '')
+                        prefix, agentNumber = tempAgentPrefix.rsplit('_agent', 1)
+                        if prefix not in actionsGenerations:
+                            actionsGenerations[prefix] = None
+                            if exists(prefix + '_agentsActions.p'):
+                                actionsGenerations[prefix] = self.pickleLoad(
+                                    prefix + '_agentsActions.p')
+                        if actionsGenerations[prefix] is not None:
+                            actions = actionsGenerations[prefix][
+                                int(agentNumber)-1]
+                        else:
+                            # archives saved before storing actions per
+                            # generation kept them in results per agent
+                            actions = self.pickleLoad(tempAgentPrefix +
+                                '_results.p')['actions']
+                        actionsArchive.append(actions)
+                        self.noveltyFilenames.append(modelFile)
+                        actionsAll = tuple(chain.from_iterable(actions))
+                        actionsUniqueID = self.actionsUniqueIDMapping[actionsAll]
+                        entry['actionsUniqueID'] = actionsUniqueID
+                        uniqueIDsArchive.append(actionsUniqueID)
                         if actionsUniqueID not in self.agentsUniqueIDs:
                             # checking if unique ID from actions already exists
                             self.agentsUnique.append(iAgent)
-                            self.agentsUniqueIDs.append(actionsUniqueID)
+                            self.agentsUniqueIDs.add(actionsUniqueID)
                         else:
                             self.agentsDuplicate.append(iAgent)
+                    self.noveltyActions, self.noveltyActionsLengths = (
+                        self.encodeNoveltyActions(actionsArchive))
+                    self.noveltyUniqueIDs = array(uniqueIDsArchive, dtype=int32)
 
             # simulating agents in environment, returning average of n runs
             self.rewards = self.runAgentsRepeatedlyGenetic(agentCounts, n, env)
@@ -272,76 +493,68 @@ class FloPyAgent():
             sortedParentIdxs = argsort(
                 self.rewards)[::-1][:self.hyParams['NAGENTELITES']]
             self.bestAgentReward = self.rewards[sortedParentIdxs[0]]
-            self.pickleDump(join(self.tempModelPrefix +
-                '_agentsSortedParentIndexes.p'), sortedParentIdxs)
+            numpySave(join(self.tempModelPrefix +
+                '_agentsSortedParentIndexes.npy'), sortedParentIdxs)
 
             if self.noveltySearch:
                 print('Performing novelty search')
                 # iterating through agents and storing with novelty in archive
                 # calculating average nearest-neighbor novelty score
+                actionsGeneration, uniqueIDsGeneration = [], []
                 for iAgent in range(self.hyParams['NAGENTS']):
-                    noveltiesAgent, actionsAll = [], []
                     itemID = self.noveltyItemCount
                     k = self.noveltyItemCount
                     agentStr = 'agent' + str(k+1)
-                    self.noveltyArchive[agentStr] = {}
+                    entry = self.noveltyArchive[agentStr] = {}
                     tempAgentPrefix = join(self.tempModelPrefix + '_agent'
                         + str(iAgent + 1).zfill(self.zFill))
-                    modelFile = tempAgentPrefix + '.h5'
-                    pth = join(tempAgentPrefix + '_results.p')
-                    actions = self.pickleLoad(pth)['actions']
-                    actionsAll = [action for actions_ in actions for action in actions_]
+                    modelFile = tempAgentPrefix + '.npz'
+                    actions = self.agentsActions[iAgent]
+                    actionsGeneration.append(actions)
+                    actionsAll = tuple(chain.from_iterable(actions))
                     # https://stackoverflow.com/questions/38291372/assign-unique-id-to-list-of-lists-in-python-where-duplicates-get-the-same-id
-                    actionsUniqueID = self.actionsUniqueIDMapping[tuple(actionsAll)]
-                    self.noveltyArchive[agentStr]['itemID'] = itemID
-                    self.noveltyArchive[agentStr]['modelFile'] = modelFile
-                    self.noveltyArchive[agentStr]['actions'] = actions
-                    self.noveltyArchive[agentStr]['actionsUniqueID'] = actionsUniqueID
+                    actionsUniqueID = self.actionsUniqueIDMapping[actionsAll]
+                    entry['itemID'] = itemID
+                    entry['modelFile'] = modelFile
+                    entry['actionsUniqueID'] = actionsUniqueID
+                    self.noveltyFilenames.append(modelFile)
+                    uniqueIDsGeneration.append(actionsUniqueID)
                     if actionsUniqueID not in self.agentsUniqueIDs:
                         # checking if unique ID from actions already exists
                         self.agentsUnique.append(k)
-                        self.agentsUniqueIDs.append(actionsUniqueID)
+                        self.agentsUniqueIDs.add(actionsUniqueID)
                     else:
                         self.agentsDuplicate.append(k)
                     self.noveltyItemCount += 1
+                # appending encoded actions of this generation to the archive
+                actionsEncoded, actionsLengths = self.encodeNoveltyActions(
+                    actionsGeneration)
+                self.noveltyActions = concatenate((self.noveltyActions,
+                    actionsEncoded))
+                self.noveltyActionsLengths = concatenate((
+                    self.noveltyActionsLengths, actionsLengths))
+                self.noveltyUniqueIDs = concatenate((self.noveltyUniqueIDs,
+                    array(uniqueIDsGeneration, dtype=int32)))
                 print('Novelty search:', len(self.agentsUnique), 'unique agents', len(self.agentsDuplicate), 'duplicate agents')
 
                 # updating novelty of unique agents
-                # Note: This can become a massive bottleneck with increasing
-                # number of stored agent information and generations
-                # despite parallelization
-                noveltiesUniqueAgents, t0 = [], time()
-                args = [iAgent for iAgent in self.agentsUnique]
-                chunksTotal = self.yieldChunks(args,
-                    cores*self.maxTasksPerWorkerMutate)
-                for chunk in chunksTotal:
-                    noveltiesPerAgent = self.multiprocessChunks(
-                        self.calculateNoveltyPerAgent, chunk)
-                    noveltiesUniqueAgents += noveltiesPerAgent
-                for iUniqueAgent in self.agentsUnique:
-                    agentStr = 'agent' + str(iUniqueAgent+1)
-                    actionsUniqueID = self.noveltyArchive[agentStr]['actionsUniqueID']
-                    novelty = noveltiesUniqueAgents[actionsUniqueID]
-                    self.noveltyArchive[agentStr]['novelty'] = novelty
-
-                # updating novelty of duplicate agents from existing value
-                for iDuplicateAgent in self.agentsDuplicate:
-                    # finding ID of agent representing duplicate agent's actions
-                    agentStr = 'agent' + str(iDuplicateAgent+1)
-                    actionsUniqueID = self.noveltyArchive[agentStr]['actionsUniqueID']
-                    novelty = noveltiesUniqueAgents[actionsUniqueID]
-                    self.noveltyArchive[agentStr]['novelty'] = novelty
+                # Note: This scales quadratically with the number of stored
+                # agents, hence computed by a compiled kernel in parallel
+                # threads instead of pickling the archive to processes
+                t0 = time()
+                noveltiesUniqueAgents = noveltiesFromActions(
+                    array(self.agentsUnique, dtype=int32),
+                    self.noveltyActions, self.noveltyActionsLengths)
+                # updating novelty of unique and of duplicate agents,
+                # the latter from the agent representing their actions
+                self.novelties = noveltiesUniqueAgents[self.noveltyUniqueIDs]
+                # note: archive entries are inserted in order of their item ID
+                for entry, novelty in zip(self.noveltyArchive.values(),
+                    self.novelties):
+                    entry['novelty'] = novelty
 
                 self.pickleDump(join(self.tempModelPrefix +
                     '_noveltyArchive.p'), self.noveltyArchive)
-                self.novelties, self.noveltyFilenames = [], []
-                for k in range(self.noveltyItemCount):
-                    agentStr = 'agent' + str(k+1)
-                    self.novelties.append(
-                        self.noveltyArchive[agentStr]['novelty'])
-                    self.noveltyFilenames.append(
-                        self.noveltyArchive[agentStr]['modelFile'])
-                # print('len(self.noveltyFilenames)', len(self.noveltyFilenames))
                 print('Finished novelty search, took', time()-t0, 's')
 
             # returning best-performing agents
@@ -367,7 +580,7 @@ class FloPyAgent():
                 # as the storage requirements can be substantial
                 for agentIdx in range(self.hyParams['NAGENTS']):
                     remove(join(self.tempModelPrefix + '_agent' +
-                        str(agentIdx + 1).zfill(self.zFill) + '.h5'))
+                        str(agentIdx + 1).zfill(self.zFill) + '.npz'))
 
     def createNNModel(self, seed=None):
         """Create fully-connected feed-forward multi-layer neural network."""
@@ -375,7 +588,7 @@ class FloPyAgent():
             seed = self.SEED
         model = Sequential()
         initializer = glorot_uniform(seed=seed)
-        nHiddenNodes = copy(self.hyParams['NHIDDENNODES'])
+        nHiddenNodes = list(self.hyParams['NHIDDENNODES'])
         # resetting numpy seeds to generate reproducible architecture
         numpySeed(seed)
 
@@ -384,10 +597,10 @@ class FloPyAgent():
             for layerIdx in range(len(nHiddenNodes)):
                 nHiddenNodes[layerIdx] = randint(2, self.hyParams['NHIDDENNODES'][layerIdx]+1)
         for layerIdx in range(len(nHiddenNodes)):
-            inputShape = shape(self.observationsVector) if layerIdx == 0 else []
+            inputShape = self.observationsShape if layerIdx == 0 else []
             model.add(Dense(units=nHiddenNodes[layerIdx],
                 input_shape=inputShape,
-                kernel_initializer=glorot_uniform(seed=seed),
+                kernel_initializer=initializer,
                 use_bias=True))
             if self.hyParams['BATCHNORMALIZATION']:
                 model.add(BatchNormalization())
@@ -415,62 +628,70 @@ class FloPyAgent():
         """Update replay memory by adding a given step's data to a memory
         replay array.
         """
-        self.replayMemory.append(transition)
+        i = self.replayMemoryCursor
+        self.replayStates[i] = transition[0]
+        self.replayActions[i] = transition[1]
+        self.replayRewards[i] = transition[2]
+        self.replayNewStates[i] = transition[3]
+        self.replayDones[i] = transition[4]
+        nMemory = len(self.replayRewards)
+        self.replayMemoryCursor = (i + 1) % nMemory
+        # plain conditional, as the module's min is numpy's
+        if self.replayMemoryCount < nMemory:
+            self.replayMemoryCount += 1
 
     def updateReplayMemoryZeroReward(self, steps):
         """Update replay memory rewards to zero in case game ended up with zero
         reward.
         """
-        for i in range(steps):
-            self.replayMemory[-i][2] = 0.0
+        if steps > self.replayMemoryCount:
+            steps = self.replayMemoryCount
+        idxs = (self.replayMemoryCursor - 1 - arange(steps)) % len(
+            self.replayRewards)
+        self.replayRewards[idxs] = 0.0
 
     def train(self, terminal_state, step):
         """Trains main network every step during a game."""
 
         # training only if certain number of samples is already saved
-        if len(self.replayMemory) < self.hyParams['REPLAYMEMORYSIZEMIN']:
+        if self.replayMemoryCount < self.hyParams['REPLAYMEMORYSIZEMIN']:
             return
 
         # retrieving a subset of random samples from memory replay table
-        minibatch = randomSample(self.replayMemory,
-                                 self.hyParams['MINIBATCHSIZE']
-                                 )
+        minibatch = array(randomSample(range(self.replayMemoryCount),
+                                       self.hyParams['MINIBATCHSIZE']
+                                       ))
 
         # retrieving current states from minibatch
         # then querying NN model for Q values
-        current_states = array([transition[0] for transition in minibatch])
-        current_qs_list = self.mainModel.predict(current_states)
+        # calling compiled models directly, as predict adds considerable
+        # overhead on batches this small
+        current_states = self.replayStates[minibatch]
+        current_qs_list = self.getqsGivenPredictFunction(self.mainPredict,
+            current_states)
 
         # retrieving future states from minibatch
         # then querying NN model for Q values
         # when using target network, query it, otherwise main network should be
         # queried
-        new_current_states = array([transition[3] for transition in minibatch])
-        future_qs_list = self.targetModel.predict(new_current_states)
-
-        X, y = [], []
-        # enumerating batches
-        for index, (current_state, action, reward, new_current_state,
-                    done) in enumerate(minibatch):
-
-            # If not a terminal state, get new q from future states,
-            # otherwise set it to 0
-            # almost like with Q Learning, but we use just part of equation
-            if not done:
-                max_future_q = max(future_qs_list[index])
-                new_q = reward + self.hyParams['DISCOUNT'] * max_future_q
-            else:
-                new_q = reward
-
-            # updating Q value for given state
-            current_qs = current_qs_list[index]
-            current_qs[action] = new_q
-            # appending states to training data
-            X.append(current_state)
-            y.append(current_qs)
+        new_current_states = self.replayNewStates[minibatch]
+        future_qs_list = self.getqsGivenPredictFunction(self.targetPredict,
+            new_current_states)
+
+        # If not a terminal state, get new q from future states,
+        # otherwise set it to 0
+        # almost like with Q Learning, but we use just part of equation
+        rewards = self.replayRewards[minibatch]
+        dones = self.replayDones[minibatch]
+        new_qs = rewards + self.hyParams['DISCOUNT'] * future_qs_list.max(
+            axis=1) * (~dones)
+
+        # updating Q value for given states
+        current_qs_list[arange(len(minibatch)),
+            self.replayActions[minibatch]] = new_qs
 
         # fitting on all samples as one batch, logging only on terminal state
-        self.mainModel.fit(array(X), array(y),
+        self.mainModel.fit(current_states, current_qs_list,
                            batch_size=self.hyParams['MINIBATCHSIZE'],
                            verbose=0, shuffle=False
                            )
@@ -495,22 +716,28 @@ class FloPyAgent():
         # retrieving initial state
         current_state = env.observationsVectorNormalized
 
+        # binding loop invariants to locals
+        actionSpace, actionSpaceSize = self.actionSpace, self.actionSpaceSize
+        mainPredict, epsilon = self.mainPredict, self.epsilon
+        render = self.envSettings['RENDER']
+        renderEvery = self.envSettings['RENDEREVERY']
+
         # resetting counters prior to restarting game
         # env.stepInitial()
         self.gameReward, self.gameStep, done = 0, 1, False
         for game in range(self.hyParams['NAGENTSTEPS']):
             # epsilon defines the fraction of random to queried actions
-            if random() > self.epsilon:
+            if random() > epsilon:
                 # retrieving action from Q table
-                actionIdx = argmax(self.getqsGivenAgentModel(
-                    self.mainModel, env.observationsVectorNormalized))
+                actionIdx = argmax(self.getqsGivenPredictFunction(
+                    mainPredict, [current_state])[0])
             else:
                 # retrieving random action
-                actionIdx = randint(0, self.actionSpaceSize)
-            action = self.actionSpace[actionIdx]
+                actionIdx = randint(0, actionSpaceSize)
+            action = actionSpace[actionIdx]
 
             new_state, reward, done, info = env.step(
-                env.observationsVectorNormalized, action, self.gameReward)
+                current_state, action, self.gameReward)
             new_state = env.observationsVectorNormalized
 
             # updating replay memory
@@ -522,13 +749,13 @@ class FloPyAgent():
             # counting reward
             self.gameReward += reward
 
-            if self.envSettings['RENDER']:
+            if render:
                 if not done:
-                    if not game+1 % self.envSettings['RENDEREVERY']:
+                    if not game+1 % renderEvery:
                         env.render()
 
             # transforming new continous state to new discrete state
-            current_state = env.observationsVectorNormalized
+            current_state = new_state
             self.gameStep += 1
 
             if done:
@@ -537,38 +764,71 @@ class FloPyAgent():
     def crossvalidateDQN(self, env):
         """Simulate a given number of games and cross-validate current DQN
         success.
+
+        All cross-validation games are stepped in lockstep, so that a single
+        batched query of the main network serves every running game per step.
         """
 
-        # loop to cross-validate on unique set of models
-        self.gameRewardsCV = []
-        for iGame in range(self.hyParams['NGAMESCROSSVALIDATED']):
-            # resetting variables and environment
-            self.gameReward, step, done = 0.0, 0, False
-            seedCV = self.seedsCV[iGame]
-            env.reset(seedCV, initWithSolution=env.initWithSolution)
+        # initializing one environment per cross-validation seed
+        # in unique temporary folders to avoid overwriting model files
+        nGames = self.hyParams['NGAMESCROSSVALIDATED']
+        envsCV = []
+        for iGame in range(nGames):
+            envsCV.append(FloPyEnv(env.ENVTYPE, env.PATHMF2005, env.PATHMP6,
+                MODELNAME=env.MODELNAME + 'CV' + str(iGame+1).zfill(self.zFill),
+                _seed=self.seedsCV[iGame], flagSavePlot=env.SAVEPLOT,
+                flagManualControl=env.MANUALCONTROL, flagRender=env.RENDER,
+                NAGENTSTEPS=self.hyParams['NAGENTSTEPS'],
+                nLay=env.nLay, nRow=env.nRow, nCol=env.nCol,
+                initWithSolution=env.initWithSolution))
+        self.gameRewardsCV = [0.0 for _ in range(nGames)]
+        donesCV = [False for _ in range(nGames)]
+        # preallocating batch of states, filled with each game's observation
+        statesCV = zeros((nGames, len(env.observationsVectorNormalized)),
+            dtype=float32)
+        for iGame, envCV in enumerate(envsCV):
+            statesCV[iGame] = envCV.observationsVectorNormalized
+
+        def stepGame(iGame, action):
+            envCV = envsCV[iGame]
+            return envCV.step(envCV.observationsVectorNormalized, action,
+                self.gameRewardsCV[iGame])
+
+        # stepping games concurrently, as each waits for its own MODFLOW and
+        # MODPATH processes in a separate model folder, unless plotting
+        with ThreadPoolExecutor(max_workers=nGames) as executor:
+            if env.RENDER or env.MANUALCONTROL or env.SAVEPLOT:
+                mapSteps = map
+            else:
+                mapSteps = executor.map
 
-            current_state = env.observationsVectorNormalized
-            # iterating until game ends
+            # iterating until all games end
             for _ in range(self.hyParams['NAGENTSTEPS']):
-                # querying for Q values
-                actionIdx = argmax(self.getqsGivenAgentModel(
-                    self.mainModel, env.observationsVectorNormalized))
-                action = self.actionSpace[actionIdx]
+                activeGames = [iGame for iGame in range(nGames)
+                    if not donesCV[iGame]]
+                if len(activeGames) == 0:
+                    break
+                # querying for Q values of all running games at once
+                actionIdxs = argmax(self.getqsGivenPredictFunction(
+                    self.mainPredict, statesCV[activeGames]), axis=1)
+                actions = [self.actionSpace[actionIdx]
+                    for actionIdx in actionIdxs]
                 # simulating and counting total reward
-                new_state, reward, done, info = env.step(
-                    env.observationsVectorNormalized, action,
-                    self.gameReward)
-                self.gameReward += reward
-                if self.envSettings['RENDER']:
-                    if not iGame % self.envSettings['RENDEREVERY']:
-                        if not done: env.render()
-                current_state = new_state
-                step += 1
-                if done: break
-
-            if not env.success:
-                self.gameReward = 0.0
-            self.gameRewardsCV.append(self.gameReward)
+                results = list(mapSteps(stepGame, activeGames, actions))
+                for iGame, (new_state, reward, done, info) in zip(activeGames,
+                    results):
+                    envCV = envsCV[iGame]
+                    statesCV[iGame] = envCV.observationsVectorNormalized
+                    self.gameRewardsCV[iGame] += reward
+                    if self.envSettings['RENDER']:
+                        if not iGame % self.envSettings['RENDEREVERY']:
+                            if not done: envCV.render()
+                    donesCV[iGame] = done
+
+        for iGame, envCV in enumerate(envsCV):
+            if not envCV.success:
+                self.gameRewardsCV[iGame] = 0.0
+            envCV.removeWorkspace()
 
         self.average_rewardCV = mean(self.gameRewardsCV)
         self.min_rewardCV = min(self.gameRewardsCV)
@@ -576,6 +836,8 @@ class FloPyAgent():
 
     def runAgentsGenetic(self, agentCounts, env):
         """Run genetic agent optimisation, if opted for with multiprocessing.
+
+        Returns rewards and actions of all games per agent.
         """
 
         # running in parallel if specified
@@ -589,14 +851,13 @@ class FloPyAgent():
                 if hasattr(self, 'env'):
                     del self.env
 
-            reward_agents, runtimes = [], []
+            reward_agents, actions_agents, runtimes = [], [], []
             runtimeGenEstimate, runtimeGensEstimate = None, None
             generationsRemaining = (self.hyParams['NGENERATIONS'] -
                 (self.geneticGeneration + 1))
             chunksTotal = self.yieldChunks(agentCounts,
                 cores*self.maxTasksPerWorker)
             nChunks = ceil((max(agentCounts)+1)/(cores*self.maxTasksPerWorker))
-            nChunks *= (self.hyParams['NGAMESAVERAGED']+1-self.currentGame)
             nChunksRemaining = copy(nChunks)
             # batch processing to avoid memory explosion
             # https://stackoverflow.com/questions/18414020/memory-usage-keep-growing-with-pythons-multiprocessing-pool/20439272
@@ -614,115 +875,145 @@ class FloPyAgent():
 
                 print('Currently: ' + str(min(chunk)) + '/' + 
                       str(max(agentCounts)+1) + ' agents, ' +
-                      str(self.currentGame) + '/' +
-                      str(self.hyParams['NGAMESAVERAGED']) + ' games, ' +
+                      str(self.hyParams['NGAMESAVERAGED']) + ' games each, ' +
                       str(self.geneticGeneration + 1) + '/' +
                       str(self.hyParams['NGENERATIONS']) + ' generations\n' +
                       runtimeGenEstimate + ' h for generation, ' +
                       runtimeGensEstimate + ' h for all generations')
                 print('----------')
-                reward_chunks = self.multiprocessChunks(
+                results_chunks = self.multiprocessChunks(
                     self.runAgentsGeneticSingleRun, chunk)
-                reward_agents += reward_chunks
+                reward_agents += [result[0] for result in results_chunks]
+                actions_agents += [result[1] for result in results_chunks]
                 runtimes.append(time() - t0)
                 nChunksRemaining -= 1
 
-        return reward_agents
+        return reward_agents, actions_agents
 
     def runAgentsGeneticSingleRun(self, agentCount):
-        """Run single game within genetic agent optimisation."""
+        """Run all games of an agent within genetic agent optimisation.
+
+        Games are played in lockstep, so that a single batched query of the
+        agent serves every running game per step. Returns the game rewards
+        and the actions of all games.
+        """
 
         tempAgentPrefix = join(self.tempModelPrefix + '_agent'
             + str(agentCount + 1).zfill(self.zFill))
-        t0load_model = time()
-        # loading specific agent and weights with given ID
-        agent = load_model(join(tempAgentPrefix + '.h5'), compile=False)
-        # print('debug duration load_model compiled', time() - t0load_model)
-
-        MODELNAMETEMP = ('Temp' + self.pid +
-            '_' + str(agentCount + 1))
-        SEEDTEMP = self.envSettings['SEEDENV'] + self.currentGame
-        if self.envSettings['SURROGATESIMULATOR'] is None:
-            env = self.env
-            # resetting to unique temporary folder to enable parallelism
-            # Note: This will resimulate the initial environment state
-            env.reset(MODELNAME=MODELNAMETEMP, _seed=SEEDTEMP)
-        elif self.envSettings['SURROGATESIMULATOR'] is not None:
-            # this must be initialized here as surrogate TensorFlow models
-            # cannot be pickled for use in parallel operation
-            env = FloPyEnvSurrogate(self.envSettings['SURROGATESIMULATOR'],
-                self.envSettings['ENVTYPE'],
-                MODELNAME=MODELNAMETEMP, _seed=SEEDTEMP,
-                NAGENTSTEPS=self.hyParams['NAGENTSTEPS'])
-    
-        results, keys = {}, ['trajectories', 'actions', 'rewards', 'wellCoords']
-        if self.currentGame == 1:
-            trajectories = [[] for _ in range(self.hyParams['NGAMESAVERAGED'])]
-            actions = [[] for _ in range(self.hyParams['NGAMESAVERAGED'])]
-            rewards = [[] for _ in range(self.hyParams['NGAMESAVERAGED'])]
-            wellCoords = [[] for _ in range(self.hyParams['NGAMESAVERAGED'])]
-        elif self.currentGame > 1:
-            pth = join(tempAgentPrefix + '_results.p')
-            results = self.pickleLoad(pth)
-            trajectories, actions = results[keys[0]], results[keys[1]]
-            rewards, wellCoords = results[keys[2]], results[keys[3]]
-
-        r, t0game = 0, time()
-        for step in range(self.hyParams['NAGENTSTEPS']):
-            actionIdx = argmax(self.getqsGivenAgentModel(agent,
-                env.observationsVectorNormalized))
-            action = self.actionSpace[actionIdx]
-            
-            t0step = time()
-            # note: need to feed normalized observations
-            new_observation, reward, done, info = env.step(
-                env.observationsVectorNormalized, action, r)
-            # print('debug duration step', time() - t0step)
-            actions[self.currentGame-1].append(action)
-            rewards[self.currentGame-1].append(reward)
-            wellCoords[self.currentGame-1].append(env.wellCoords)
-            r += reward
-            if self.envSettings['RENDER']:
-                env.render()
-
-            if done or (step == self.hyParams['NAGENTSTEPS']-1): # or if reached end
-                # print('debug duration game', time() - t0game)
-                if env.success == False:
-                    r = 0
-                # saving specific simulation results pertaining to agent
-                trajectories[self.currentGame-1].append(env.trajectories)
-                objects = [trajectories, actions, rewards, wellCoords]
-                for i, objectCurrent in enumerate(objects):
-                    results[keys[i]] = objectCurrent
-                pth = join(tempAgentPrefix + '_results.p')
-                self.pickleDump(pth, results)
+        # loading specific agent and weights with given ID in background,
+        # overlapping with the initial simulations of the environments
+        # Note: environments are not initialized in threads, as they are
+        # seeded through the global numpy random state
+        loader = ThreadPoolExecutor(max_workers=1)
+        agentLoading = loader.submit(self.loadAgentModelCached,
+            join(tempAgentPrefix + '.npz'))
+
+        nGames = self.hyParams['NGAMESAVERAGED']
+        envs = []
+        for iGame in range(nGames):
+            MODELNAMETEMP = ('Temp' + self.pid +
+                '_' + str(agentCount + 1) + '_' + str(iGame + 1))
+            SEEDTEMP = self.envSettings['SEEDENV'] + iGame + 1
+            if self.envSettings['SURROGATESIMULATOR'] is None:
+                # initializing in unique temporary folder to enable parallelism
+                envs.append(FloPyEnv(self.env.ENVTYPE, self.env.PATHMF2005,
+                    self.env.PATHMP6, MODELNAME=MODELNAMETEMP, _seed=SEEDTEMP,
+                    flagSavePlot=self.env.SAVEPLOT,
+                    flagManualControl=self.env.MANUALCONTROL,
+                    flagRender=self.env.RENDER, nLay=self.env.nLay,
+                    nRow=self.env.nRow, nCol=self.env.nCol,
+                    NAGENTSTEPS=self.hyParams['NAGENTSTEPS'],
+                    initWithSolution=self.env.initWithSolution))
+            elif self.envSettings['SURROGATESIMULATOR'] is not None:
+                # this must be initialized here as surrogate TensorFlow models
+                # cannot be pickled for use in parallel operation
+                envs.append(FloPyEnvSurrogate(
+                    self.envSettings['SURROGATESIMULATOR'],
+                    self.envSettings['ENVTYPE'],
+                    MODELNAME=MODELNAMETEMP, _seed=SEEDTEMP,
+                    NAGENTSTEPS=self.hyParams['NAGENTSTEPS']))
+
+        agent, agentPredict = agentLoading.result()
+        loader.shutdown()
+
+        nSteps = self.hyParams['NAGENTSTEPS']
+        trajectories = [[] for _ in range(nGames)]
+        actions = [[] for _ in range(nGames)]
+        # storing results of steps per game in columns, padded to full length
+        actionIdxsGames = zeros((nGames, nSteps), dtype=uint8)
+        rewards = zeros((nGames, nSteps), dtype=float32)
+        wellCoords = zeros((nGames, nSteps, 3), dtype=float32)
+        steps = zeros(nGames, dtype=int32)
+        r, dones = [0 for _ in range(nGames)], [False for _ in range(nGames)]
+        for step in range(nSteps):
+            activeGames = [iGame for iGame in range(nGames) if not dones[iGame]]
+            if len(activeGames) == 0:
                 break
+            # querying for Q values of all running games at once
+            states = [envs[iGame].observationsVectorNormalized
+                for iGame in activeGames]
+            actionIdxs = argmax(self.getqsGivenPredictFunction(agentPredict,
+                states), axis=1)
+            for iGame, actionIdx in zip(activeGames, actionIdxs):
+                env = envs[iGame]
+                action = self.actionSpace[actionIdx]
+
+                # note: need to feed normalized observations
+                new_observation, reward, done, info = env.step(
+                    env.observationsVectorNormalized, action, r[iGame])
+                actions[iGame].append(action)
+                actionIdxsGames[iGame, step] = actionIdx
+                rewards[iGame, step] = reward
+                wellCoords[iGame, step] = env.wellCoords
+                r[iGame] += reward
+                if self.envSettings['RENDER']:
+                    env.render()
+
+                if done or (step == nSteps-1): # or if reached end
+                    if env.success == False:
+                        r[iGame] = 0
+                    trajectories[iGame].append(env.trajectories)
+                    steps[iGame] = step + 1
+                    dones[iGame] = True
+        # removing remaining model files here, as pool workers exit without
+        # running exit handlers
+        if self.envSettings['SURROGATESIMULATOR'] is None:
+            for env in envs:
+                env.removeWorkspace()
+
+        # saving specific simulation results pertaining to agent,
+        # with actions as indices of the action space
+        # Note: only trajectories of variable length still need pickling
+        savez(join(tempAgentPrefix + '_results.npz'), actions=actionIdxsGames,
+            rewards=rewards, wellCoords=wellCoords, steps=steps)
+        self.pickleDump(join(tempAgentPrefix + '_trajectories.p'), trajectories)
 
-        return r
+        return r, actions
 
     def runAgentsRepeatedlyGenetic(self, agentCounts, n, env):
         """Run all agents within genetic optimisation for a defined number of
         games.
         """
 
-        reward_agentsMin = zeros(len(agentCounts))
-        reward_agentsMax = zeros(len(agentCounts))
-        reward_agentsMean = zeros(len(agentCounts))
-        for game in range(n):
-            self.currentGame = game + 1
-            print('Currently: ' + str(game + 1) + '/' + str(n) + ' games, ' +
-                  str(self.geneticGeneration + 1) + '/' +
-                  str(self.hyParams['NGENERATIONS']) + ' generations')
-            rewardsAgentsCurrent = self.runAgentsGenetic(agentCounts, env)
-            reward_agentsMin = minimum(reward_agentsMin, rewardsAgentsCurrent)
-            reward_agentsMax = maximum(reward_agentsMax, rewardsAgentsCurrent)
-            reward_agentsMean = add(reward_agentsMean, rewardsAgentsCurrent)
-        reward_agentsMean = divide(reward_agentsMean, n)
+        # all games of an agent are played within a single run
+        self.currentGame = n
+        print('Currently: ' + str(n) + ' games, ' +
+              str(self.geneticGeneration + 1) + '/' +
+              str(self.hyParams['NGENERATIONS']) + ' generations')
+        rewardsAgents, self.agentsActions = self.runAgentsGenetic(
+            agentCounts, env)
+        # reducing rewards of shape (agents, games) per agent
+        rewardsAgents = array(rewardsAgents)
+        reward_agentsMin = rewardsAgents.min(axis=1)
+        reward_agentsMax = rewardsAgents.max(axis=1)
+        reward_agentsMean = rewardsAgents.mean(axis=1)
 
         prefix = self.tempModelPrefix
-        self.pickleDump(prefix + '_agentsRewardsMin.p', reward_agentsMin)
-        self.pickleDump(prefix + '_agentsRewardsMax.p', reward_agentsMax)
-        self.pickleDump(prefix + '_agentsRewardsMean.p', reward_agentsMean)
+        numpySave(prefix + '_agentsRewardsMin.npy', reward_agentsMin)
+        numpySave(prefix + '_agentsRewardsMax.npy', reward_agentsMax)
+        numpySave(prefix + '_agentsRewardsMean.npy', reward_agentsMean)
+        # storing actions of all agents in a single file for novelty search
+        self.pickleDump(prefix + '_agentsActions.p', self.agentsActions)
 
         return reward_agentsMean
 
@@ -732,9 +1023,10 @@ class FloPyAgent():
         """
 
         agent = self.createNNModel(seed=self.envSettings['SEEDAGENT']+agentIdx)
-        agent.save(join(self.tempModelpth, self.envSettings['MODELNAME'] +
-            '_gen' + str(generation).zfill(self.zFill) + '_agent' +
-            str(agentIdx + 1).zfill(self.zFill) + '.h5'))
+        self.saveAgentModelWeights(agent, join(self.tempModelpth,
+            self.envSettings['MODELNAME'] + '_gen' +
+            str(generation).zfill(self.zFill) + '_agent' +
+            str(agentIdx + 1).zfill(self.zFill) + '.npz'))
 
     def returnChildrenGenetic(self, sortedParentIdxs):
         """Mutate best parents, keep elite child and save them to disk
@@ -747,8 +1039,8 @@ class FloPyAgent():
             tempNextModelPrefixBefore = self.tempNextModelPrefix
             self.tempModelPrefix = self.tempPrevModelPrefix
             self.tempNextModelPrefix = tempModelPrefixBefore
-            self.rewards = self.pickleLoad(join(self.tempModelPrefix +
-                '_agentsRewardsMean.p'))
+            self.rewards = self.loadGeneticResults(join(self.tempModelPrefix +
+                '_agentsRewardsMean.npy'))
         elif not self.rereturnChildrenGenetic:
             self.tempModelPrefix = self.tempModelPrefix
             generation = self.geneticGeneration + 1
@@ -766,25 +1058,21 @@ class FloPyAgent():
                 recalculateNovelties = True
 
             if recalculateNovelties:
-                self.novelties, self.noveltyFilenames = [], []
-                for k in range(self.noveltyItemCount):
-                    agentStr = 'agent' + str(k+1)
-                    self.novelties.append(
-                        self.noveltyArchive[agentStr]['novelty'])
-                    self.noveltyFilenames.append(
-                        self.noveltyArchive[agentStr]['modelFile'])
+                self.loadNoveltiesFromArchive()
             self.candidateNoveltyParentIdxs = argsort(
                 self.novelties)[::-1][:self.hyParams['NNOVELTYELITES']]
 
-        bestAgent = load_model(join(self.tempModelPrefix + '_agent' +
-            str(sortedParentIdxs[0] + 1).zfill(self.zFill) + '.h5'),
-            compile=False)
+        # copying files of best agent, as no model needs to be built for it
+        bestAgentFile = join(self.tempModelPrefix + '_agent' +
+            str(sortedParentIdxs[0] + 1).zfill(self.zFill) + '.npz')
 
         if not self.rereturnChildrenGenetic:
-            bestAgent.save(join(self.tempModelPrefix + '_agentBest.h5'))
+            self.copyAgentFile(bestAgentFile, join(self.tempModelPrefix +
+                '_agentBest.npz'))
         if generation < self.hyParams['NGENERATIONS']:
-            bestAgent.save(join(tempNextModelPrefix + '_agent' +
-                str(self.hyParams['NAGENTS']).zfill(self.zFill) + '.h5'))
+            self.copyAgentFile(bestAgentFile, join(tempNextModelPrefix +
+                '_agent' + str(self.hyParams['NAGENTS']).zfill(self.zFill) +
+                '.npz'))
             nAgentElites = self.hyParams['NAGENTELITES']
             nNoveltyAgents = self.hyParams['NNOVELTYELITES']
             self.candidateParentIdxs = sortedParentIdxs[:nAgentElites]
@@ -800,13 +1088,20 @@ class FloPyAgent():
             self.tempNextModelPrefix = tempNextModelPrefixBefore
 
     def returnChildrenGeneticSingleRun(self, childIdx):
-        """
+        """Mutate a randomly selected parent to create a given child.
+
+        Each child draws from its own generator seeded by generation and
+        child index, as forked workers would otherwise share random states.
         """
 
+        generationChild = self.geneticGeneration + (
+            0 if self.rereturnChildrenGenetic else 1)
+        rng = default_rng([self.envSettings['SEEDAGENT'], generationChild,
+            int(childIdx)])
         len_ = len(self.candidateParentIdxs)
-        selected_agent_index = self.candidateParentIdxs[randint(len_)]
+        selected_agent_index = self.candidateParentIdxs[rng.integers(len_)]
         agentPth = join(self.tempModelPrefix + '_agent' +
-            str(selected_agent_index + 1).zfill(self.zFill) + '.h5')
+            str(selected_agent_index + 1).zfill(self.zFill) + '.npz')
 
         if self.noveltySearch:
             if ((self.geneticGeneration+1) % self.hyParams['ADDNOVELTYEVERY']) == 0:
@@ -834,17 +1129,18 @@ class FloPyAgent():
         success = False
         while not success:
             try:
-                agent = load_model(agentPth,
-                    compile=False)
+                weights, modelConfig = self.loadParentWeightsCached(agentPth)
                 success = True
             except Exception as e:
                 success = False
                 print('Retrying loading parent agent, possibly due to lock.')
                 sleep(1)
-        # altering parent agent to create child agent
-        childrenAgent = self.mutateGenetic(agent)
-        childrenAgent.save(join(self.tempNextModelPrefix +
-            '_agent' + str(childIdx + 1).zfill(self.zFill) + '.h5'))
+        # altering parent weights to create child agent, without building
+        # a model as the architecture is unchanged
+        self.saveAgentWeights(self.mutateGeneticWeights(weights, rng=rng),
+            modelConfig,
+            join(self.tempNextModelPrefix + '_agent' +
+            str(childIdx + 1).zfill(self.zFill) + '.npz'))
 
     def mutateGenetic(self, agent):
         """Mutate single agent model.
@@ -853,27 +1149,69 @@ class FloPyAgent():
         https://arxiv.org/pdf/1712.06567.pdf
         """
 
+        agent.set_weights(self.mutateGeneticWeights(agent.get_weights()))
+
+        return agent
+
+    def mutateGeneticWeights(self, weights, rng=None):
+        """Return mutated copy of given agent weights.
+
+        Each weight tensor is shifted by a normally distributed offset with a
+        given probability. Decisions and offsets of all tensors are drawn at
+        once, and unchanged tensors are shared with the given weights.
+        Draws from a given random generator or the global random state.
+        """
+
         mProb = self.hyParams['MUTATIONPROBABILITY']
         mPower = self.hyParams['MUTATIONPOWER']
-        weights, paramIdx = agent.get_weights(), 0
-        for parameters in weights:
-            if self.mutateDecision(mProb):
-                weights[paramIdx] = add(parameters, mPower * randn())
-            paramIdx += 1
-        agent.set_weights(weights)
+        if rng is None:
+            mutations = self.mutateDecision(mProb, size=len(weights))
+            offsets = mPower * randn(len(weights))
+        else:
+            mutations = rng.random(len(weights)) < mProb
+            offsets = mPower * rng.standard_normal(len(weights))
+        weights = [add(parameters, offset) if mutation else parameters
+            for parameters, mutation, offset in zip(weights, mutations, offsets)]
 
-        return agent
+        return weights
 
-    def mutateDecision(self, probability):
+    def mutateDecision(self, probability, size=None):
         """Return boolean defining whether to mutate or not."""
-        return random() < probability
+        return random(size) < probability
 
     def getqsGivenAgentModel(self, agentModel, state):
         """ Query given model for Q values given observations of state
         """
-        # predict_on_batch robust in parallel operation?
-        return agentModel.predict_on_batch(
-            array(state).reshape(-1, (*shape(state))))[0]
+        # compiling forward pass once per model to skip Keras call overhead
+        if agentModel not in agentPredictsCache:
+            agentPredictsCache[agentModel] = self.compilePredictFunction(
+                agentModel)
+        if self.stateBuffer is None or self.stateBuffer.shape[1] != len(state):
+            self.stateBuffer = zeros((1, len(state)), dtype=float32)
+        self.stateBuffer[0] = state
+        return agentPredictsCache[agentModel](self.stateBuffer).numpy()[0]
+
+    def getqsGivenPredictFunction(self, predict, states):
+        """ Query given compiled predict function for Q values given a batch
+        of observed states
+        """
+        return predict(asarray(states, dtype=float32)).numpy()
+
+    def compilePredictFunction(self, agentModel):
+        """Compile inference graph of a given model for repeated queries.
+
+        The fixed input signature avoids retracing for varying batch sizes.
+        The model is referenced weakly, so that cached functions keyed by their
+        model do not keep it alive.
+        Note: XLA compilation per function (jit_compile) is unavailable in the
+        TensorFlow version used, graph compilation still fuses Python-side
+        dispatch of all layers into a single call.
+        """
+        inputSignature = [TensorSpec(shape=[None, agentModel.input_shape[-1]],
+            dtype=float32)]
+        agentModelRef = ref(agentModel)
+        return tfFunction(lambda x: agentModelRef()(x, training=False),
+            input_signature=inputSignature)
 
     def loadAgentModel(self, modelNameLoad=None, compiled=False):
         """Load an agent model."""
@@ -897,6 +1235,94 @@ class FloPyAgent():
 
         return agentModel
 
+    def saveAgentModelWeights(self, agentModel, modelFile):
+        """Save architecture and raw weights of an agent model.
+
+        Genetic agents are never optimized along gradients, so storing
+        optimizer state and metadata with HDF5 is unnecessary.
+        """
+        self.saveAgentWeights(agentModel.get_weights(), agentModel.to_json(),
+            modelFile)
+
+    def saveAgentWeights(self, weights, modelConfig, modelFile):
+        """Save architecture and raw weights of an agent."""
+        savez(modelFile, *weights, modelConfig=modelConfig)
+
+    def loadAgentWeights(self, modelFile):
+        """Load raw weights and architecture of an agent."""
+        modelFile = self.savedAgentFile(modelFile)
+        if modelFile.endswith('.h5'):
+            agentModel = load_model(modelFile, compile=False)
+            return agentModel.get_weights(), agentModel.to_json()
+        with numpyLoad(modelFile) as f:
+            weights = [f['arr_' + str(i)] for i in range(len(f.files)-1)]
+            modelConfig = str(f['modelConfig'])
+
+        return weights, modelConfig
+
+    def savedAgentFile(self, modelFile):
+        """Return file of a saved agent, falling back to the HDF5 model
+        agents were saved as before, so that earlier runs can be resumed.
+        """
+        if not exists(modelFile):
+            modelFileHDF5 = modelFile.replace('.npz', '.h5')
+            if exists(modelFileHDF5):
+                return modelFileHDF5
+        return modelFile
+
+    def copyAgentFile(self, modelFile, modelFileCopy):
+        """Copy a saved agent, converting agents saved as HDF5 models."""
+        if self.savedAgentFile(modelFile).endswith('.h5'):
+            weights, modelConfig = self.loadAgentWeights(modelFile)
+            self.saveAgentWeights(weights, modelConfig, modelFileCopy)
+        else:
+            copyfile(modelFile, modelFileCopy)
+
+    def loadGeneticResults(self, path):
+        """Load an array of results per agent saved with numpy, falling back
+        to the pickle they were saved as before, so that earlier runs can be
+        resumed.
+        """
+        if not exists(path) and exists(path.replace('.npy', '.p')):
+            return asarray(self.pickleLoad(path.replace('.npy', '.p')))
+        return numpyLoad(path)
+
+    def loadParentWeightsCached(self, modelFile):
+        """Load raw weights and architecture of a parent agent, reusing them
+        for all children of this parent created in the current process.
+        """
+
+        modified = getmtime(self.savedAgentFile(modelFile))
+        if modelFile in parentWeightsCache:
+            if parentWeightsCache[modelFile][0] == modified:
+                return parentWeightsCache[modelFile][1]
+        parentWeightsCache[modelFile] = (modified,
+            self.loadAgentWeights(modelFile))
+
+        return parentWeightsCache[modelFile][1]
+
+    def loadAgentModelCached(self, modelFile):
+        """Load an agent model with its compiled predict function.
+
+        Models are built only once per architecture and process, loading
+        solely the weights of any further agent sharing the architecture.
+        Note: Weight shapes identify the architecture, as all other
+        architectural hyperparameters are fixed during an optimisation.
+        """
+
+        with numpyLoad(modelFile) as f:
+            weights = [f['arr_' + str(i)] for i in range(len(f.files)-1)]
+            architecture = tuple(weight.shape for weight in weights)
+            if architecture not in agentModelsCache:
+                # reading architecture only if not yet built in this process
+                agentModel = model_from_json(str(f['modelConfig']))
+                agentModelsCache[architecture] = (agentModel,
+                    self.compilePredictFunction(agentModel))
+        agentModel, agentPredict = agentModelsCache[architecture]
+        agentModel.set_weights(weights)
+
+        return agentModel, agentPredict
+
     def getAction(self, mode='random', keyPressed=None, agent=None,
             modelNameLoad=None, state=None):
         """Determine an action given an agent model.
@@ -919,10 +1345,10 @@ class FloPyAgent():
             self.action = self.actionSpace[actionIdx]
         if mode == 'modelNameLoad':
             agentModel = self.loadAgentModel(modelNameLoad)
-            actionIdx = argmax(self.getqsGivenAgentModel(agentModel, state))
+            actionIdx = int(argmax(self.getqsGivenAgentModel(agentModel, state)))
             self.action = self.actionSpace[actionIdx]
         if mode == 'model':
-            actionIdx = argmax(self.getqsGivenAgentModel(agent, state))
+            actionIdx = int(argmax(self.getqsGivenAgentModel(agent, state)))
             self.action = self.actionSpace[actionIdx]
 
         return self.action
@@ -931,23 +1357,18 @@ class FloPyAgent():
         # checking if bestModel already exists for current generation
         # skipping calculations then to to resume at a later stage
         continueFlag, breakFlag = False, False
-        bestAgentpth = join(self.tempModelPrefix + '_agentBest.h5')
+        # generations saved before switching to numpy files are read as well
+        bestAgentpth = self.savedAgentFile(join(self.tempModelPrefix +
+            '_agentBest.npz'))
         if exists(bestAgentpth):
             indexespth = join(self.tempModelPrefix +
-                '_agentsSortedParentIndexes.p')
+                '_agentsSortedParentIndexes.npy')
             noveltyArchivepth = join(self.tempModelPrefix +
                 '_noveltyArchive.p')
-            self.sortedParentIdxs = self.pickleLoad(indexespth)
+            self.sortedParentIdxs = self.loadGeneticResults(indexespth)
             self.noveltyArchive = self.pickleLoad(noveltyArchivepth)
             self.flagSkipGeneration, continueFlag = True, True
-
-            self.novelties, self.noveltyFilenames = [], []
-            for k in range(self.noveltyItemCount):
-                agentStr = 'agent' + str(k+1)
-                self.novelties.append(
-                    self.noveltyArchive[agentStr]['novelty'])
-                self.noveltyFilenames.append(
-                    self.noveltyArchive[agentStr]['modelFile'])
+            self.loadNoveltiesFromArchive()
 
         # regenerating children for generation to resume at
         else:
@@ -964,53 +1385,76 @@ class FloPyAgent():
 
         return self.sortedParentIdxs, continueFlag, breakFlag
 
+    def loadNoveltiesFromArchive(self):
+        """Retrieve novelties and model files of agents in novelty archive."""
+        entries = [self.noveltyArchive['agent' + str(k+1)]
+            for k in range(self.noveltyItemCount)]
+        self.novelties = array([entry['novelty'] for entry in entries])
+        self.noveltyFilenames = [entry['modelFile'] for entry in entries]
+
     def calculateNoveltyPerPair(self, args):
-        agentStr = 'agent' + str(args[0]+1)
-        agentStr2 = 'agent' + str(args[1]+1)
-        actions = self.noveltyArchive[agentStr]['actions']
-        actions2 = self.noveltyArchive[agentStr2]['actions']
+        # Note: novelty search uses noveltiesFromActions on encoded actions,
+        # this remains for comparing single pairs of archived agents
+        iAgent, iAgent2 = args[0], args[1]
+        lengths = self.noveltyActionsLengths
         novelty = 0.
-        for g in range(len(actions)):
-            novelty += self.actionNoveltyMetric(actions[g],
-                actions2[g])
+        for g in range(lengths.shape[1]):
+            novelty += self.actionNoveltyMetric(
+                self.noveltyActions[iAgent, g, :lengths[iAgent, g]],
+                self.noveltyActions[iAgent2, g, :lengths[iAgent2, g]])
 
         return novelty
 
     def calculateNoveltyPerAgent(self, iAgent):
-        agentStr = 'agent' + str(iAgent+1)
-        novelties = []
         # self.hyParams['NNOVELTYNEIGHBORS']
-        for iAgent2 in range(self.noveltyItemCount):
-            if iAgent != iAgent2:
-                novelties.append(self.calculateNoveltyPerPair([iAgent, iAgent2]))
-        novelty = mean(novelties)
+        novelty = noveltiesFromActions(array([iAgent], dtype=int32),
+            self.noveltyActions, self.noveltyActionsLengths)[0]
 
         return novelty
 
+    def encodeNoveltyActions(self, actionsAgents):
+        """Encode actions of agents as padded array of action indices.
+
+        Returns an array of shape (agents, games, steps) and the number of
+        actions taken per agent and game.
+        """
+
+        actionIdxs = {action: idx for idx, action in enumerate(self.actionSpace)}
+        nGames = self.hyParams['NGAMESAVERAGED']
+        actionsEncoded = zeros((len(actionsAgents), nGames,
+            self.hyParams['NAGENTSTEPS']), dtype=uint8)
+        actionsLengths = zeros((len(actionsAgents), nGames), dtype=int32)
+        for iAgent, actions in enumerate(actionsAgents):
+            for g, actionsGame in enumerate(actions):
+                actionsLengths[iAgent, g] = len(actionsGame)
+                actionsEncoded[iAgent, g, :len(actionsGame)] = [
+                    actionIdxs[action] for action in actionsGame]
+
+        return actionsEncoded, actionsLengths
+
     def actionNoveltyMetric(self, actions1, actions2):
-        # finding largest object, or determining equal length
-        if len(actions1) > len(actions2):
-            shorterObj = actions2
-            longerObj = actions1
-        if len(actions1) <= len(actions2):
-            shorterObj = actions1
-            longerObj = actions2
+        # comparing along the shorter of both, without copying arrays
+        lenShorter = len(actions1)
+        if len(actions2) < lenShorter:
+            lenShorter = len(actions2)
 
-        diffsCount = len(shorterObj) - sum(array(shorterObj) == array(longerObj[:len(shorterObj)]))
+        diffsCount = count_nonzero(asarray(actions1[:lenShorter]) !=
+            asarray(actions2[:lenShorter]))
 
         # enabling this might promote agents having acted longer but not
         # too different to begin with
-        # diffsCount += float(abs(len(longerObj) - len(shorterObj)))
+        # diffsCount += float(abs(len(actions1) - len(actions2)))
 
         # dividing by the length of it, to avoid rewarding longer objects
-        novelty = diffsCount/len(shorterObj)
+        novelty = diffsCount/lenShorter
 
         return novelty
 
     def saveBestAgent(self, MODELNAME):
         # saving best agent of the current generation
-        bestAgent = load_model(join(self.tempModelPrefix + '_agentBest.h5'),
-                compile=False)
+        # exporting as HDF5 for compatibility with loading agent models
+        bestAgent, _ = self.loadAgentModelCached(join(self.tempModelPrefix +
+            '_agentBest.npz'))
         self.bestAgentFileName = (f'{MODELNAME}' + '_gen' +
             str(self.geneticGeneration+1).zfill(self.zFill) + '_avg' +
             f'{self.bestAgentReward:_>7.1f}')
@@ -1051,26 +1495,59 @@ class FloPyAgent():
             yield lst[i:i + n]
 
     def multiprocessChunks(self, function, chunk, parallelProcesses=None, wait=False):
-        """Process function in parallel given a chunk of arguments."""
+        """Process function in parallel given a chunk of arguments.
+
+        Results are always awaited and returned in order of the arguments.
+        Tasks are handed out as workers become free, so that slow tasks do
+        not hold back the remaining ones.
+        """
+
+        if parallelProcesses == None:
+            parallelProcesses = self.envSettings['NAGENTSPARALLEL']
+        p = self.getProcessPool(parallelProcesses)
+        chunksize = len(chunk)//(4*parallelProcesses)
+        if chunksize < 1:
+            chunksize = 1
+        results = [None for _ in range(len(chunk))]
+        # ordering results by index of their arguments, as completion order
+        # differs (correct reward order is validated)
+        for idx, result in p.imap_unordered(
+            lambda args: (args[0], function(args[1])), enumerate(chunk),
+            chunksize=chunksize):
+            results[idx] = result
+
+        return results
+
+    def getProcessPool(self, parallelProcesses):
+        """Return persistent process pool with given number of processes.
+
+        Reusing pools avoids spawning processes for every chunk, while workers
+        are still recycled after a number of tasks to bound memory usage.
+        Pools are only restarted if the settings they were started with change.
+        """
 
         # Pool object from pathos instead of multiprocessing library necessary
         # as tensor.keras models are currently not pickleable
         # https://github.com/tensorflow/tensorflow/issues/32159
-        if parallelProcesses == None:
-            parallelProcesses = self.envSettings['NAGENTSPARALLEL']
-        p = Pool(processes=parallelProcesses)
-        pasync = p.map_async(function, chunk)
-        # waiting is important to order results correctly when running
-        # -- really?
-        # in asynchronous mode (correct reward order is validated)
-        pasync = pasync.get()
-        if wait:
-            pasync.wait()
-        p.close()
-        p.join()
-        p.terminate()
-
-        return pasync
+        poolSettings = (parallelProcesses, self.maxTasksPerWorker)
+        if poolSettings not in self.processPools:
+            if not self.processPools:
+                # closing at exit only agents that started pools
+                atexitRegister(self.closeProcessPools)
+            self.processPools[poolSettings] = Pool(
+                processes=parallelProcesses,
+                initializer=initializeWorkerCPU,
+                maxtasksperchild=self.maxTasksPerWorker)
+        return self.processPools[poolSettings]
+
+    def closeProcessPools(self):
+        """Close and join all persistent process pools."""
+        for p in self.processPools.values():
+            p.close()
+            p.join()
+            p.terminate()
+        self.processPools = {}
+        atexitUnregister(self.closeProcessPools)
 
     def pickleLoad(self, path):
         """Load pickled object from file."""
@@ -1080,9 +1557,13 @@ class FloPyAgent():
         return objectLoaded
 
     def pickleDump(self, path, objectToDump):
-        """Store object to file using pickle."""
+        """Store object to file using pickle.
+
+        The highest available protocol stores numpy arrays in large frames,
+        instead of the default protocol's per-object copies.
+        """
         filehandler = open(path, 'wb')
-        dump(objectToDump, filehandler)
+        dump(objectToDump, filehandler, protocol=HIGHEST_PROTOCOL)
         filehandler.close()
 
     def GPUAllowMemoryGrowth(self):
@@ -1131,8 +1612,6 @@ class FloPyEnv():
         self.MANUALCONTROLTIME = manualControlTime
         self.RENDER = flagRender
         self.NAGENTSTEPS = NAGENTSTEPS
-        self.info, self.comments = '', ''
-        self.done = False
         self.nLay, self.nRow, self.nCol = nLay, nRow, nCol
         self.initWithSolution = initWithSolution
 
@@ -1140,19 +1619,32 @@ class FloPyEnv():
         if 'library.zip' in self.wrkspc:
             # changing workspace in case of call from executable
             self.wrkspc = dirname(dirname(self.wrkspc))
-        # setting up the model path and ensuring it exists
-        self.modelpth = join(self.wrkspc, 'models', self.MODELNAME)
-        if not exists(self.modelpth):
-            makedirs(self.modelpth)
+        self.defineEnvironment()
+        self.initializeSimulators(PATHMF2005, PATHMP6)
+
+        self.initializeGame(_seed)
+
+    def initializeGame(self, _seed=None):
+        """Initialize a new game with random action, particle and well.
+
+        Settings, grid and simulators of the environment are kept, so that
+        resetting only repeats the game-dependent part of construction.
+        """
+
+        self.info, self.comments = '', ''
+        self.done = False
+        self.mp, self.transientModel = None, False
+        # the initial model is steady-state, while steps are transient
+        self.periodSteadiness = True
+
+        self.initializeWorkspace()
 
         self._SEED = _seed
         if self._SEED is not None:
             numpySeed(self._SEED)
-        self.defineEnvironment()
         self.timeStep, self.keyPressed = 0, None
         self.reward, self.rewardCurrent = 0., 0.
 
-        self.initializeSimulators(PATHMF2005, PATHMP6)
         if self.ENVTYPE == '1' or self.ENVTYPE == '2':
             self.initializeAction()
         self.initializeParticle()
@@ -1184,10 +1676,10 @@ class FloPyEnv():
         """
 
         # running MODFLOW to determine steady-state solution as a initial state
-        self.runMODFLOW()
+        self.runMODFLOWSteadyState()
 
         self.state = {}
-        self.state['heads'] = copy(self.heads)
+        self.state['heads'] = self.heads
         if self.ENVTYPE == '1':
             self.state['actionValueNorth'] = self.actionValueNorth
             self.state['actionValueSouth'] = self.actionValueSouth
@@ -1200,71 +1692,36 @@ class FloPyEnv():
         self.observations = {}
         self.observationsNormalized, self.observationsNormalizedHeads = {}, {}
         self.observations['particleCoords'] = self.particleCoords
-        self.observations['headsSampledField'] = self.heads[0::self.sampleHeadsEvery,
-                                                0::self.sampleHeadsEvery,
-                                                0::self.sampleHeadsEvery]
-        lParticle, cParticle, rParticle = self.cellInfoFromCoordinates(
-            [self.particleCoords[0], self.particleCoords[1], self.particleCoords[2]])
-        lWell, cWell, rWell = self.cellInfoFromCoordinates(
-            [self.wellX, self.wellY, self.wellZ])
-
+        self.observations['headsSampledField'] = self.heads[self.sampleHeadsSlice]
         # note: these heads from actions are not necessary to return as observations for surrogate modeling
         # but for reinforcement learning
-        if self.ENVTYPE == '1':
-            self.observations['heads'] = [self.actionValueNorth,
-                                          self.actionValueSouth]
-        elif self.ENVTYPE == '2':
-            # this can cause issues with unit testing, as model expects different input 
-            self.observations['heads'] = [self.actionValue]
-        elif self.ENVTYPE == '3':
-            self.observations['heads'] = [self.headSpecNorth,
-                                          self.headSpecSouth]
-        # note: it sees the surrounding heads of the particle and the well
-        self.observations['heads'] += [self.heads[lParticle-1, rParticle-1, cParticle-1]]
-        self.observations['heads'] += self.surroundingHeadsFromCoordinates(self.particleCoords, distance=0.5*self.wellRadius)
-        self.observations['heads'] += self.surroundingHeadsFromCoordinates(self.particleCoords, distance=1.5*self.wellRadius)
-        self.observations['heads'] += self.surroundingHeadsFromCoordinates(self.particleCoords, distance=2.5*self.wellRadius)
-        self.observations['heads'] += self.surroundingHeadsFromCoordinates(self.wellCoords, distance=1.5*self.wellRadius)
-        self.observations['heads'] += self.surroundingHeadsFromCoordinates(self.wellCoords, distance=2.0*self.wellRadius)
+        self.observations['heads'] = self.observeHeads()
 
         self.observations['wellQ'] = self.wellQ
         self.observations['wellCoords'] = self.wellCoords
 
-        self.observationsNormalized['particleCoords'] = divide(
-            copy(self.particleCoords), self.minX + self.extentX)
-        self.observationsNormalized['headsSampledField'] = divide(array(self.observations['headsSampledField']) - self.minH,
-            self.maxH - self.minH)
-        self.observationsNormalized['heads'] = divide(array(self.observations['heads']) - self.minH,
-            self.maxH - self.minH)
-        self.observationsNormalized['wellQ'] = self.wellQ / self.minQ
-        self.observationsNormalized['wellCoords'] = divide(
-            self.wellCoords, self.minX + self.extentX)
-        self.observationsNormalizedHeads['heads'] = divide(array(self.heads) - self.minH,
-            self.maxH - self.minH)
-
-        self.observationsVector = self.observationsDictToVector(
+        self.observationsNormalized['particleCoords'] = multiply(
+            self.particleCoords, self.invX)
+        self.observationsNormalized['headsSampledField'] = self.normalizeHeads(
+            self.observations['headsSampledField'])
+        self.observationsNormalized['heads'] = self.normalizeHeads(
+            self.observations['heads'])
+        self.observationsNormalized['wellQ'] = self.wellQ * self.invQ
+        self.observationsNormalized['wellCoords'] = multiply(
+            self.wellCoords, self.invX)
+        self.observationsNormalizedHeads['heads'] = self.normalizeHeads(
+            self.heads)
+
+        self.observationsVector = self.observationsDictToArray(
             self.observations)
-        self.observationsVectorNormalized = self.observationsDictToVector(
-            self.observationsNormalized)
+        self.observationsVectorNormalized = self.observationsDictToArray(
+            self.observationsNormalized, dtype=float32)
         self.observationsVectorNormalizedHeads = self.observationsDictToVector(
             self.observationsNormalizedHeads)
 
-        if self.ENVTYPE == '1':
-            self.stressesVectorNormalized = [(self.actionValueSouth - self.minH)/(self.maxH - self.minH),
-                                             (self.actionValueNorth - self.minH)/(self.maxH - self.minH),
-                                             self.wellQ/self.minQ, self.wellX/(self.minX+self.extentX),
-                                             self.wellY/(self.minX+self.extentX), self.wellZ/(self.minX+self.extentX)]
-        elif self.ENVTYPE == '2':
-            self.stressesVectorNormalized = [(self.actionValue - self.minH)/(self.maxH - self.minH),
-                                             self.wellQ/self.minQ, self.wellX/(self.minX+self.extentX),
-                                             self.wellY/(self.minX+self.extentX), self.wellZ/(self.minX+self.extentX)]
-        elif self.ENVTYPE == '3':
-            self.stressesVectorNormalized = [(self.headSpecSouth - self.minH)/(self.maxH - self.minH),
-                                             (self.headSpecNorth - self.minH)/(self.maxH - self.minH),
-                                             self.wellQ/self.minQ, self.wellX/(self.minX+self.extentX),
-                                             self.wellY/(self.minX+self.extentX), self.wellZ/(self.minX+self.extentX)]
+        self.stressesVectorNormalized = self.normalizeStresses()
 
-        self.timeStepDuration = []
+        self.timeStepDurationTotal = 0.
 
     def step(self, observations, action, rewardCurrent):
         """Perform a single step of forwards simulation."""
@@ -1326,50 +1783,29 @@ class FloPyEnv():
         self.observations = {}
         self.observationsNormalized, self.observationsNormalizedHeads = {}, {}
         self.observations['particleCoords'] = self.particleCoords
-        self.observations['headsSampledField'] = self.heads[0::self.sampleHeadsEvery,
-                                                0::self.sampleHeadsEvery,
-                                                0::self.sampleHeadsEvery]
-        lParticle, cParticle, rParticle = self.cellInfoFromCoordinates(
-            [self.particleCoords[0], self.particleCoords[1], self.particleCoords[2]])
-        lWell, cWell, rWell = self.cellInfoFromCoordinates(
-            [self.wellX, self.wellY, self.wellZ])
+        self.observations['headsSampledField'] = self.heads[self.sampleHeadsSlice]
         # note: these heads from actions are not necessary to return as observations for surrogate modeling
         # but for reinforcement learning
-        if self.ENVTYPE == '1':
-            self.observations['heads'] = [self.actionValueNorth,
-                                          self.actionValueSouth]
-        elif self.ENVTYPE == '2':
-            # this can cause issues with unit testing, as model expects different input 
-            self.observations['heads'] = [self.actionValue]
-        elif self.ENVTYPE == '3':
-            self.observations['heads'] = [self.headSpecNorth,
-                                          self.headSpecSouth]
-        # note: it sees the surrounding heads of the particle and the well
-        self.observations['heads'] += [self.heads[lParticle-1, rParticle-1, cParticle-1]]
-        self.observations['heads'] += self.surroundingHeadsFromCoordinates(self.particleCoords, distance=0.5*self.wellRadius)
-        self.observations['heads'] += self.surroundingHeadsFromCoordinates(self.particleCoords, distance=1.5*self.wellRadius)
-        self.observations['heads'] += self.surroundingHeadsFromCoordinates(self.particleCoords, distance=2.5*self.wellRadius)
-        self.observations['heads'] += self.surroundingHeadsFromCoordinates(self.wellCoords, distance=1.5*self.wellRadius)
-        self.observations['heads'] += self.surroundingHeadsFromCoordinates(self.wellCoords, distance=2.0*self.wellRadius)
+        self.observations['heads'] = self.observeHeads()
 
         self.observations['wellQ'] = self.wellQ
         self.observations['wellCoords'] = self.wellCoords
-        self.observationsNormalized['particleCoords'] = divide(
-            copy(self.particleCoordsAfter), self.minX + self.extentX)
-        self.observationsNormalized['headsSampledField'] = divide(array(self.observations['headsSampledField']) - self.minH,
-            self.maxH - self.minH)
-        self.observationsNormalized['heads'] = divide(array(self.observations['heads']) - self.minH,
-            self.maxH - self.minH)
-        self.observationsNormalized['wellQ'] = self.wellQ / self.minQ
-        self.observationsNormalized['wellCoords'] = divide(
-            self.wellCoords, self.minX + self.extentX)
-        self.observationsNormalizedHeads['heads'] = divide(array(self.heads) - self.minH,
-            self.maxH - self.minH)
-
-        self.observationsVector = self.observationsDictToVector(
+        self.observationsNormalized['particleCoords'] = multiply(
+            self.particleCoordsAfter, self.invX)
+        self.observationsNormalized['headsSampledField'] = self.normalizeHeads(
+            self.observations['headsSampledField'])
+        self.observationsNormalized['heads'] = self.normalizeHeads(
+            self.observations['heads'])
+        self.observationsNormalized['wellQ'] = self.wellQ * self.invQ
+        self.observationsNormalized['wellCoords'] = multiply(
+            self.wellCoords, self.invX)
+        self.observationsNormalizedHeads['heads'] = self.normalizeHeads(
+            self.heads)
+
+        self.observationsVector = self.observationsDictToArray(
             self.observations)
-        self.observationsVectorNormalized = self.observationsDictToVector(
-            self.observationsNormalized)
+        self.observationsVectorNormalized = self.observationsDictToArray(
+            self.observationsNormalized, dtype=float32)
         self.observationsVectorNormalizedHeads = self.observationsDictToVector(
             self.observationsNormalizedHeads)
 
@@ -1378,79 +1814,60 @@ class FloPyEnv():
         else:
             self.success = False
 
-        if self.ENVTYPE == '1':
-            self.stressesVectorNormalized = [(self.actionValueSouth - self.minH)/(self.maxH - self.minH),
-                                             (self.actionValueNorth - self.minH)/(self.maxH - self.minH),
-                                             self.wellQ/self.minQ, self.wellX/(self.minX+self.extentX),
-                                             self.wellY/(self.minX+self.extentX), self.wellZ/(self.minX+self.extentX)]
-        elif self.ENVTYPE == '2':
-            self.stressesVectorNormalized = [(self.actionValue - self.minH)/(self.maxH - self.minH),
-                                             self.wellQ/self.minQ, self.wellX/(self.minX+self.extentX),
-                                             self.wellY/(self.minX+self.extentX), self.wellZ/(self.minX+self.extentX)]
-        elif self.ENVTYPE == '3':
-            self.stressesVectorNormalized = [(self.headSpecSouth - self.minH)/(self.maxH - self.minH),
-                                             (self.headSpecNorth - self.minH)/(self.maxH - self.minH),
-                                             self.wellQ/self.minQ, self.wellX/(self.minX+self.extentX),
-                                             self.wellY/(self.minX+self.extentX), self.wellZ/(self.minX+self.extentX)]
-
-        # checking if particle is within horizontal distance of well
-        dx = self.particleCoords[0] - self.wellCoords[0]
-        # why would the correction for Y coordinate be necessary
-        dy = self.extentY - self.particleCoords[1] - self.wellCoords[1]
-        self.distanceWellParticle = sqrt(dx**2 + dy**2)
-        if self.distanceWellParticle <= self.wellRadius:
-            self.done = True
-            self.reward = (self.rewardCurrent) * (-1.0)
-
-        # checking if particle has reached eastern boundary
-        if self.particleCoordsAfter[0] >= self.minX + self.extentX - self.dCol:
-            self.done = True
-
-        # checking if particle has returned to western boundary
-        if self.particleCoordsAfter[0] <= self.minX + self.dCol:
-            self.done = True
+        self.stressesVectorNormalized = self.normalizeStresses()
+
+        # checking if particle reached the well, a boundary or the step limit
+        self.done, penalty = gameTermination(
+            self.particleCoords[0], self.particleCoords[1],
+            self.particleCoordsAfter[0], self.particleCoordsAfter[1],
+            self.wellCoords[0], self.wellCoords[1], self.minX, self.minY,
+            self.extentX, self.extentY, self.dCol, self.dRow,
+            self.wellRadiusSquared, self.ENVTYPE == '1' or self.ENVTYPE == '3',
+            bool(self.done), self.timeStep, self.maxSteps)
+        if penalty:
             self.reward = (self.rewardCurrent) * (-1.0)
 
-        if self.ENVTYPE == '1' or self.ENVTYPE == '3':
-            # checking if particle has reached northern boundary
-            if self.particleCoordsAfter[1] >= self.minY + self.extentY - self.dRow:
-            # if self.particleCoordsAfter[1] >= self.minY + \
-            #         self.extentY - self.dRow:
-                self.done = True
-                self.reward = (self.rewardCurrent) * (-1.0)
-
-        # checking if particle has reached southern boundary
-        if self.particleCoordsAfter[1] <= self.minY + self.dRow:
-            self.done = True
-            self.reward = (self.rewardCurrent) * (-1.0)
-
-        # aborting game if a threshold of steps have been taken
-        if self.timeStep == self.maxSteps:
-            if self.done != True:
-                self.done = True
-                self.reward = (self.rewardCurrent) * (-1.0)
-
         self.rewardCurrent += self.reward
-        self.timeStepDuration.append(time() - t0total)
+        self.timeStepDurationTotal += time() - t0total
 
         if self.RENDER or self.MANUALCONTROL or self.SAVEPLOT:
             self.render()
 
         if self.done:
-            # print('debug average timeStepDuration', mean(self.timeStepDuration))
+            # print('debug average timeStepDuration', self.timeStepDurationTotal / self.timeStep)
 
             # necessary to remove these file handles to release file locks
             del self.mf, self.cbb, self.hdobj
 
-            for f in listdir(self.modelpth):
-                # removing files in folder
-                remove(join(self.modelpth, f))
-            if exists(self.modelpth):
-                # removing folder with model files after run
-                rmdir(self.modelpth)
+            # removing folder with model files after run
+            self.removeWorkspace()
 
         return self.observations, self.reward, self.done, self.info
 
+    def initializeWorkspace(self):
+        """Create a unique temporary folder for the model files of a game.
+
+        Model files are kept in memory if a tmpfs with sufficient space is
+        available, otherwise in the models folder of the workspace.
+        """
+
+        # generously estimating model files from arrays of the grid size,
+        # as heads, budgets and inputs are written in single precision
+        workspaceSize = 64 * 4 * self.nLay * self.nRow * self.nCol
+        modelsPath = join(self.wrkspc, 'models')
+        if exists('/dev/shm'):
+            if disk_usage('/dev/shm').free > workspaceSize:
+                modelsPath = '/dev/shm'
+        if not exists(modelsPath):
+            makedirs(modelsPath)
+        self.modelpth = mkdtemp(prefix=self.MODELNAME, dir=modelsPath)
+        modelWorkspaces.add(self.modelpth)
+
+    def removeWorkspace(self):
+        """Remove the temporary folder with model files of a game."""
+        rmtree(self.modelpth, ignore_errors=True)
+        modelWorkspaces.discard(self.modelpth)
+
     def defineEnvironment(self):
         """Define environmental variables."""
 
@@ -1474,6 +1891,7 @@ class FloPyEnv():
         self.periodSteadiness = True
         self.maxSteps = self.NAGENTSTEPS
         self.sampleHeadsEvery = 10
+        self.sampleHeadsSlice = (slice(0, None, self.sampleHeadsEvery),)*3
 
         self.dRow = self.extentX / self.nCol
         self.dCol = self.extentY / self.nRow
@@ -1481,8 +1899,18 @@ class FloPyEnv():
         self.botM = linspace(self.zTop, self.zBot, self.nLay + 1)
 
         self.wellRadius = sqrt((2 * 1.)**2 + (2 * 1.)**2)
+        self.wellRadiusSquared = self.wellRadius * self.wellRadius
         # print('debug wellRadius', self.wellRadius)
 
+        # offsets of observed locations around particle and well, each ring
+        # holding the 8 cells surrounding its center at a given distance
+        self.neighborDirections = array([[c-1, r-1] for r in range(3)
+            for c in range(3) if not (r == 1 and c == 1)])
+        self.neighborOffsetsParticle = concatenate([zeros((1, 2))] + [
+            self.neighborDirections*f*self.wellRadius for f in [0.5, 1.5, 2.5]])
+        self.neighborOffsetsWell = concatenate(
+            [self.neighborDirections*f*self.wellRadius for f in [1.5, 2.0]])
+
         if self.ENVTYPE == '1':
             self.minH = 56.0
             self.maxH = 60.0
@@ -1504,6 +1932,30 @@ class FloPyEnv():
 
         self.actionSpaceSize = len(self.actionSpace)
 
+        # defining the constant boundaries of the BAS package once, as the
+        # model is reconstructed every step
+        self.ibound = ones((self.nLay, self.nRow, self.nCol), dtype=int32)
+        if self.ENVTYPE == '1' or self.ENVTYPE == '3':
+            self.ibound[:, 1:-1, 0] = -1
+            self.ibound[:, 1:-1, -1] = -1
+            self.ibound[:, 0, :] = -1
+            self.ibound[:, -1, :] = -1
+        elif self.ENVTYPE == '2':
+            self.ibound[:, :-1, 0] = -1
+            self.ibound[:, :-1, -1] = -1
+            self.ibound[:, -1, :] = -1
+
+        # inverse ranges to normalize heads and coordinates by multiplication
+        self.invH = 1.0 / (self.maxH - self.minH)
+        self.invX = 1.0 / (self.minX + self.extentX)
+        self.invMaxH = 1.0 / self.maxH
+        self.invQ = 1.0 / self.minQ
+        # offsets and scales normalizing the stresses vector
+        nHeadsStress = 1 if self.ENVTYPE == '2' else 2
+        self.stressesOffset = array([self.minH]*nHeadsStress + [0., 0., 0., 0.])
+        self.stressesScale = array([self.invH]*nHeadsStress +
+            [self.invQ, self.invX, self.invX, self.invX])
+
         self.rewardMax = 1000
         self.distanceMax = 97.9
 
@@ -1514,7 +1966,7 @@ class FloPyEnv():
         """
 
         # setting name of MODFLOW and MODPATH executables
-        if system() == 'Windows':
+        if operatingSystem == 'Windows':
             if PATHMF2005 is None:
                 self.exe_name = join(self.wrkspc, 'simulators',
                                      'MF2005.1_12', 'bin', 'mf2005'
@@ -1527,7 +1979,7 @@ class FloPyEnv():
                                    ) + '.exe'
             elif PATHMP6 is not None:
                 self.exe_mp += PATHMP6
-        elif system() == 'Linux':
+        elif operatingSystem == 'Linux':
             if PATHMF2005 is None:
                 self.exe_name = join(self.wrkspc, 'simulators', 'mf2005')
             elif PATHMF2005 is not None:
@@ -1603,12 +2055,22 @@ class FloPyEnv():
     def initializeState(self, state):
         """Initialize aquifer hydraulic head with state from previous step."""
 
+        # copying is needed as constructingModel writes the specified heads of
+        # the next step into these starting heads, while the state of the
+        # previous step can be kept in time series of the game
         self.headsPrev = copy(self.state['heads'])
 
     def updateModel(self):
-        """Update model domain for transient simulation."""
+        """Update model domain for transient simulation.
 
-        self.constructingModel()
+        Discretization, flow, output control and solver packages are the same
+        for all transient steps, so afterwards only starting heads change.
+        """
+
+        if self.transientModel:
+            self.constructingBas()
+        else:
+            self.constructingModel()
 
     def updateWellRate(self):
         """Update model to continue using well."""
@@ -1630,7 +2092,9 @@ class FloPyEnv():
             self.wellCellRow = r
 
     def updateWell(self):
-        # adding WEL package to the MODFLOW model
+        # replacing WEL package of the MODFLOW model
+        if self.mf.get_package('WEL') is not None:
+            self.mf.remove_package('WEL')
         lrcq = {0: [[self.wellCellLayer - 1,
                      self.wellCellRow - 1,
                      self.wellCellColumn - 1,
@@ -1720,16 +2184,33 @@ class FloPyEnv():
         #     self.strt[:, -1, 5:-5] = self.headSpecSouth
         #     self.strt[:, 0, 5:-5] = self.headSpecNorth
 
-        self.ibound = ones((self.nLay, self.nRow, self.nCol), dtype=int32)
-        if self.ENVTYPE == '1' or self.ENVTYPE == '3':
-            self.ibound[:, 1:-1, 0] = -1
-            self.ibound[:, 1:-1, -1] = -1
-            self.ibound[:, 0, :] = -1
-            self.ibound[:, -1, :] = -1
-        elif self.ENVTYPE == '2':
-            self.ibound[:, :-1, 0] = -1
-            self.ibound[:, :-1, -1] = -1
-            self.ibound[:, -1, :] = -1
+        self.constructingBas()
+
+        # adding LPF package to the MODFLOW model
+        ModflowLpf(self.mf, hk=10., vka=10., ipakcb=53)
+
+        # why is this relevant for particle tracking?
+        stress_period_data = {}
+        for kper in range(self.periods):
+            for kstp in range([self.periodSteps][kper]):
+                stress_period_data[(kper, kstp)] = ['save head',
+                                                    'save drawdown',
+                                                    'save budget',
+                                                    'print head',
+                                                    'print budget'
+                                                    ]
+
+        # adding OC package to the MODFLOW model for output control
+        ModflowOc(self.mf, stress_period_data=stress_period_data,
+            compact=True)
+
+        # adding PCG package to the MODFLOW model
+        ModflowPcg(self.mf)
+
+    def constructingBas(self):
+        """Construct the BAS package with starting heads of the current step,
+        replacing a previously existing one.
+        """
 
         if self.periodSteadiness:
             self.strt = ones((self.nLay, self.nRow, self.nCol),
@@ -1753,35 +2234,21 @@ class FloPyEnv():
             self.strt[:, 0, :] = self.headSpecSouth
             self.strt[:, -1, :] = self.headSpecNorth
 
-
+        # removing a previous package frees its unit number for replacement
+        if self.mf.get_package('BAS6') is not None:
+            self.mf.remove_package('BAS6')
         ModflowBas(self.mf, ibound=self.ibound, strt=self.strt)
 
-        # adding LPF package to the MODFLOW model
-        ModflowLpf(self.mf, hk=10., vka=10., ipakcb=53)
-
-        # why is this relevant for particle tracking?
-        stress_period_data = {}
-        for kper in range(self.periods):
-            for kstp in range([self.periodSteps][kper]):
-                stress_period_data[(kper, kstp)] = ['save head',
-                                                    'save drawdown',
-                                                    'save budget',
-                                                    'print head',
-                                                    'print budget'
-                                                    ]
-
-        # adding OC package to the MODFLOW model for output control
-        ModflowOc(self.mf, stress_period_data=stress_period_data,
-            compact=True)
-
-        # adding PCG package to the MODFLOW model
-        ModflowPcg(self.mf)
-
     def runMODFLOW(self):
         """Execute forward groundwater flow simulation using MODFLOW."""
 
-        # writing MODFLOW input files
-        self.mf.write_input()
+        # writing MODFLOW input files, after the first transient step only
+        # those of the packages replaced every step
+        if self.transientModel:
+            self.mf.write_input(SelPackList=['BAS6', 'WEL'])
+        else:
+            self.mf.write_input()
+            self.transientModel = not self.periodSteadiness
         # self.check = self.mf.check(verbose=False)
 
         # running the MODFLOW model
@@ -1807,11 +2274,44 @@ class FloPyEnv():
             self.frf = self.cbb.get_data(text='FLOW RIGHT FACE')[0]
             self.fff = self.cbb.get_data(text='FLOW FRONT FACE')[0]
 
-    def runMODPATH(self):
-        """Execute forward particle tracking simulation using MODPATH."""
+    def runMODFLOWSteadyState(self):
+        """Determine steady-state solution used as initial state.
 
-        # this needs to be transformed, yet not understood why
-        self.particleCoords[0] = self.extentX - self.particleCoords[0]
+        The solution only depends on seed and settings, so seeded environments
+        reuse solutions already simulated in the current process. Subsequent
+        steps rewrite all MODFLOW input files, hence no files are needed.
+        """
+
+        key = (self.ENVTYPE, self._SEED, self.nLay, self.nRow, self.nCol)
+        if self._SEED is None or key not in steadyStateCache:
+            self.runMODFLOW()
+            if self._SEED is not None:
+                steadyStateCache[key] = (copy(self.heads), self.times,
+                    self.realTime, copy(self.frf), copy(self.fff))
+                if len(steadyStateCache) > steadyStateCacheSize:
+                    steadyStateCache.popitem(last=False)
+        else:
+            steadyStateCache.move_to_end(key)
+            heads, times, self.realTime, frf, fff = steadyStateCache[key]
+            self.heads, self.times = copy(heads), list(times)
+            self.frf, self.fff = copy(frf), copy(fff)
+            self.successMODFLOW = True
+
+    def initializeMODPATH(self):
+        """Write MODPATH simulation input files once per environment.
+
+        Only the particle location file changes between steps, as settings,
+        boundaries and file names of the flow model remain the same.
+        """
+
+        # particle location file with cell indices and fractions to fill in
+        self.mplocPath = join(self.modelpth, self.MODELNAME + '.mploc')
+        self.mplocTemplate = ('1\n1\nparticle\n1\n'
+            '1 1 1 %d %d %d %.6f %.6f %.6f 0.000000 particle\n'
+            # GroupName
+            'particle\n'
+            # LocationCount, ReleaseStartTime, ReleaseOption
+            '1 0.000000 1\n')
 
         # creating MODPATH simulation objects
         self.mp = Modpath(self.MODELNAME, exe_name=self.exe_mp,
@@ -1871,6 +2371,15 @@ class FloPyEnv():
             fOut.write(out[line])
         fOut.close()
 
+    def runMODPATH(self):
+        """Execute forward particle tracking simulation using MODPATH."""
+
+        # this needs to be transformed, yet not understood why
+        self.particleCoords[0] = self.extentX - self.particleCoords[0]
+
+        if self.mp is None:
+            self.initializeMODPATH()
+
         # determining layer, row and column corresponding to particle location
         l, c, r = self.cellInfoFromCoordinates(self.particleCoords)
 
@@ -1882,25 +2391,10 @@ class FloPyEnv():
         fracRow = (self.particleCoords[1] / self.dRow) - float(int((self.particleCoords[1] / self.dRow)))
         fracVer = self.particleCoords[2] / self.dVer
 
-        # writing current particle location to file
-        fOut = open(join(self.modelpth, self.MODELNAME + '.mploc'),
-                    'w')
-        fOut.write('1\n')
-        fOut.write(u'1\n')
-        fOut.write(u'particle\n')
-        fOut.write(u'1\n')
-        fOut.write(u'1 1 1' + u' ' + str(self.nLay - l + 1) +
-                   u' ' + str(self.nRow - r + 1) +
-                   u' ' + str(self.nCol - c + 1) +
-                   u' ' + str('%.6f' % (fracCol)) +
-                   u' ' + str('%.6f' % (fracRow)) +
-                   u' ' + str('%.6f' % (fracVer)) +
-                   u' 0.000000 ' + u'particle\n')
-
-        # GroupName
-        fOut.write('particle\n')
-        # LocationCount, ReleaseStartTime, ReleaseOption
-        fOut.write('1 0.000000 1\n')
+        # writing current particle location to file in a single write
+        fOut = open(self.mplocPath, 'w')
+        fOut.write(self.mplocTemplate % (self.nLay - l + 1,
+            self.nRow - r + 1, self.nCol - c + 1, fracCol, fracRow, fracVer))
         fOut.close()
 
         # running the MODPATH model
@@ -1922,15 +2416,12 @@ class FloPyEnv():
         # why is it running for longer?
         # print('debug self.p0[time]', self.p0['time'])
 
-        self.particleTrajX = extract(self.p0['time'] <= self.periodLength,
-                                     self.p0['x']
-                                     )
-        self.particleTrajY = extract(self.p0['time'] <= self.periodLength,
-                                     self.p0['y']
-                                     )
-        self.particleTrajZ = extract(self.p0['time'] <= self.periodLength,
-                                     self.p0['z']
-                                     )
+        # pathline times of a single particle are increasing, so positions
+        # up to the end of the period are a contiguous leading slice
+        idxEnd = searchsorted(self.p0['time'], self.periodLength, side='right')
+        self.particleTrajX = self.p0['x'][:idxEnd]
+        self.particleTrajY = self.p0['y'][:idxEnd]
+        self.particleTrajZ = self.p0['z'][:idxEnd]
 
         self.trajectories['x'].append(self.particleTrajX)
         self.trajectories['y'].append(self.particleTrajY)
@@ -1980,16 +2471,16 @@ class FloPyEnv():
     def reset(self, _seed=None, MODELNAME=None, initWithSolution=None):
         """Reset environment with same settings but potentially new seed."""
         
-        if initWithSolution == None:
-            initWithSolution=self.initWithSolution
-        
-        self.__init__(self.ENVTYPE, self.PATHMF2005, self.PATHMP6,
-            self.MODELNAME if MODELNAME is None else MODELNAME,
-            _seed=_seed, flagSavePlot=self.SAVEPLOT,
-            flagManualControl=self.MANUALCONTROL, flagRender=self.RENDER,
-            nLay=self.nLay, nRow=self.nRow, nCol=self.nCol,
-            initWithSolution=initWithSolution)
-        close()
+        if initWithSolution is not None:
+            self.initWithSolution = initWithSolution
+        if MODELNAME is not None:
+            self.MODELNAME = MODELNAME
+
+        # removing model files of a previous game not concluded
+        self.removeWorkspace()
+        self.initializeGame(_seed)
+        if self.RENDER or self.MANUALCONTROL or self.SAVEPLOT:
+            close()
 
     def render(self):
         """Plot the simulation state at the current timestep.
@@ -1997,19 +2488,25 @@ class FloPyEnv():
         Displaying and/or saving the visualisation. The active display can take
         user input from the keyboard to control the environment.
         """
+        # nothing would be displayed or saved, sparing all plotting
+        if not (self.RENDER or self.MANUALCONTROL or self.SAVEPLOT):
+            return
+
         if self.timeStep == 0:
             self.renderInitializeCanvas()
-            self.plotfilesSaved = []
             self.extent = (self.dRow / 2., self.extentX - self.dRow / 2.,
                            self.extentY - self.dCol / 2., self.dCol / 2.
                            )
 
-        self.modelmap = PlotMapView(model=self.mf, layer=0)
+        # map view reused as long as model and canvas remain the same
+        if self.timeStep == 0 or getattr(self, 'modelmapModel', None) is not self.mf:
+            self.modelmap = PlotMapView(model=self.mf, layer=0)
+            self.modelmapModel = self.mf
         # self.grid = self.modelmap.plot_grid(zorder=1, lw=0.1)
         self.headsplot = self.modelmap.plot_array(self.heads,
                                                   masked_values=[999.],
                                                   alpha=0.5, zorder=2,
-                                                  cmap=get_cmap('terrain')
+                                                  cmap=self.cmapTerrain
                                                   )
         self.quadmesh = self.modelmap.plot_ibound(zorder=3)
         # plotting discharge vectors can be computationally expensive
@@ -2040,7 +2537,7 @@ class FloPyEnv():
         if self.SAVEPLOT:
             self.renderSavePlot()
             if self.done or self.timeStep==self.NAGENTSTEPS:
-                self.renderAnimationFromFiles()
+                self.renderCloseAnimation()
 
         self.renderClearAxes()
         del self.headsplot
@@ -2048,23 +2545,27 @@ class FloPyEnv():
     def render3d(self):
         """Render environment in 3 dimensions."""
 
-        from mpl_toolkits import mplot3d
-        import numpy as np
-        from numpy import mgrid, pi
-        import matplotlib.pyplot as plt
-        from mpl_toolkits.mplot3d import axes3d
-        from matplotlib import cm
+        if not (self.RENDER or self.MANUALCONTROL or self.SAVEPLOT):
+            return
 
         if self.timeStep == 0:
             self.fig = figure(figsize=(15, 12))
             self.ax = self.fig.gca(projection='3d')
             self.ax.view_init(22.5, 90)
-            self.plotfilesSaved = []
-
-        test = self.dis.get_node_coordinates()
-        # xx, yy = np.meshgrid(test[0], test[1], sparse=True)
-        x1, y1 = np.meshgrid(test[0], test[1])
-        z1 = np.reshape(np.ndarray.flatten(self.heads), (self.nRow, self.nCol))
+            self.cmapTerrain = get_cmap('terrain')
+            # grid node coordinates remain the same throughout the game
+            nodeCoordinates = self.dis.get_node_coordinates()
+            self.render3dX, self.render3dY = meshgrid(nodeCoordinates[0],
+                nodeCoordinates[1])
+            # flattened unit sphere translated to the particle every frame
+            u = linspace(0, 2 * pi, 100)
+            v = linspace(0, pi, 100)
+            self.render3dSphereX = outer(cos(u), sin(v))
+            self.render3dSphereY = outer(sin(u), sin(v))
+            self.render3dSphereZ = 0.2 * outer(ones(u.size), cos(v))
+
+        x1, y1 = self.render3dX, self.render3dY
+        z1 = reshape(self.heads, (self.nRow, self.nCol))
         # self.ax.plot_surface(x1, y1, z1, cmap='viridis', edgecolor='none')
         # self.ax.scatter(self.trajectories['x'][-1][-1], self.trajectories['y'][-1][-1],
         #     lw=2, c='red', zorder=6)
@@ -2073,8 +2574,8 @@ class FloPyEnv():
             [self.particleCoords[0], self.particleCoords[1], self.particleCoords[2]])
         hParticle = self.heads[lParticle-1, rParticle-1, cParticle-1]
         
-        print('debug head', self.timeStep, hParticle)
-        print('particle coordinates', self.particleCoords)
+        # print('debug head', self.timeStep, hParticle)
+        # print('particle coordinates', self.particleCoords)
 
         if self.timeStep == 0:
             self.ax.scatter(self.minX, self.particleCoords[1], lw=2, c='red',
@@ -2088,7 +2589,7 @@ class FloPyEnv():
             zs = [hParticle, 12]
             self.ax.plot(xs, ys, zs, 'red', alpha=0.8, linewidth=2.5, zorder=2)
 
-        self.modelmap = PlotMapView(model=self.mf, layer=0, ax=self.ax)
+        # self.modelmap = PlotMapView(model=self.mf, layer=0, ax=self.ax)
         # # self.grid = self.modelmap.plot_grid(zorder=1, lw=0.1)
         # self.headsplot = self.modelmap.plot_array(self.heads,
         #                                           masked_values=[999.],
@@ -2107,27 +2608,24 @@ class FloPyEnv():
 
         # https://stackoverflow.com/questions/13932150/matplotlib-wrong-overlapping-when-plotting-two-3d-surfaces-on-the-same-axes/43004221
         # plotting a sphere representing the particle on top of the surface
-        from numpy import cos, sin
-        u = np.linspace(0, 2 * np.pi, 100)
-        v = np.linspace(0, np.pi, 100)
-        x2 = 1 * np.outer(np.cos(u), np.sin(v)) + self.particleCoords[0]
-        y2 = 1 * np.outer(np.sin(u), np.sin(v)) + self.particleCoords[1]
-        z2 = 0.2 * np.outer(np.ones(np.size(u)), np.cos(v)) + hParticle
+        x2 = self.render3dSphereX + self.particleCoords[0]
+        y2 = self.render3dSphereY + self.particleCoords[1]
+        z2 = self.render3dSphereZ + hParticle
         
         # self.ax.plot_surface(x1, y1, z1, rstride=8, cstride=8, alpha=0.3, antialiased=False, zorder=-1)
         # self.ax.plot_surface(x2, y2, z2, rstride=1, cstride=1, color='b', alpha=1, antialiased=False, zorder=1)
 
-        self.ax.plot_surface(x1, y2, np.where(z1<z2, z1, np.nan))
+        self.ax.plot_surface(x1, y2, where(z1<z2, z1, nan))
         self.ax.plot_surface(x2, y2, z2)
-        self.ax.plot_surface(x1, y1, np.where(z1>=z2, z1, np.nan))
+        self.ax.plot_surface(x1, y1, where(z1>=z2, z1, nan))
 
 
         cset = self.ax.contour(x1, y1, z1, zdir='z', offset=-0.5,
-            cmap=get_cmap('terrain'))
+            cmap=self.cmapTerrain)
         cset = self.ax.contour(x1, y1, z1, zdir='x', offset=0.,
-            cmap=get_cmap('terrain'))
+            cmap=self.cmapTerrain)
         cset = self.ax.contour(x1, y1, z1, zdir='y', offset=0.,
-            cmap=get_cmap('terrain'))
+            cmap=self.cmapTerrain)
         self.ax.plot([50], [50], [8], 'k--', alpha=0.5, linewidth=2.5)
         self.ax.set_xlim(0., 100.)
         self.ax.set_ylim(0., 100.)
@@ -2143,7 +2641,7 @@ class FloPyEnv():
         if self.SAVEPLOT:
             self.renderSavePlot()
             if self.done or self.timeStep==self.NAGENTSTEPS:
-                self.renderAnimationFromFiles()
+                self.renderCloseAnimation()
 
         self.renderClearAxes()
 
@@ -2153,6 +2651,8 @@ class FloPyEnv():
         self.ax = self.fig.add_subplot(1, 1, 1, aspect='equal')
         self.ax3 = self.ax.twinx()
         self.ax2 = self.ax3.twiny()
+        # colormap looked up once instead of on every rendered frame
+        self.cmapTerrain = get_cmap('terrain')
 
     def renderIdealParticleTrajectory(self, zorder=5):
         """Plot ideal particle trajectory associated with maximum reward."""
@@ -2164,7 +2664,7 @@ class FloPyEnv():
 
     def renderContourLines(self, n=30, zorder=4):
         """Plot n contour lines of the head field."""
-        self.levels = linspace(min(self.heads), max(self.heads), n)
+        self.levels = linspace(self.heads.min(), self.heads.max(), n)
         self.contours = self.modelmap.contour_array(self.heads,
             levels=self.levels, alpha=0.5, zorder=zorder)
 
@@ -2233,25 +2733,21 @@ class FloPyEnv():
         """Plot particle trajectory until current state."""
         if self.timeStep > 0:
 
-            # generating fading colors
-            countCoords, colorsLens = 0, []
-            for i in range(len(self.trajectories['x'])):
-                countCoords += len(self.trajectories['x'][i])
-                colorsLens.append(len(self.trajectories['x'][i]))
-            colorsFadeAlphas = linspace(0.1, 1.0, countCoords)
-            colorsRGBA = zeros((countCoords, 4))
+            # generating fading colors, with each trajectory taking the color
+            # of its last coordinate along all coordinates
+            colorsLens = list(map(len, self.trajectories['x']))
+            colorsFadeAlphas = linspace(0.1, 1.0, sum(colorsLens))
+            # every column is filled, sparing a zeroing pass
+            colorsRGBA = empty((len(colorsLens), 4))
             colorsRGBA[:, 0] = 1.0
-            colorsRGBA[:, 3] = colorsFadeAlphas
-
-            idxCount = 0
-            for i in range(len(self.trajectories['x'])):
-                self.ax2.plot(self.trajectories['x'][i],
-                              self.trajectories['y'][i],
-                              lw=2,
-                              c=colorsRGBA[idxCount + colorsLens[i] - 1,
-                                           :],
-                              zorder=zorder)
-                idxCount += 1
+            colorsRGBA[:, 1:3] = 0.0
+            colorsRGBA[:, 3] = colorsFadeAlphas[cumsum(colorsLens) - 1]
+
+            # plotting all trajectories as a single collection
+            segments = [column_stack((x, y)) for x, y in
+                zip(self.trajectories['x'], self.trajectories['y'])]
+            self.ax2.add_collection(LineCollection(segments, colors=colorsRGBA,
+                linewidths=2, zorder=zorder))
 
     def renderRemoveAxesTicks(self):
         """Remove axes ticks from figure."""
@@ -2320,8 +2816,12 @@ class FloPyEnv():
             show(block=False)
             waitforbuttonpress(timeout=self.MANUALCONTROLTIME)
 
-    def renderSavePlot(self):
-        """Save plot of the currently rendered timestep."""
+    def renderSavePlot(self, dpi=70):
+        """Append plot of the currently rendered timestep to the animation.
+
+        Frames are rendered to an in-memory RGBA buffer and streamed to the
+        animation file, instead of being saved and read back as images.
+        """
         if self.timeStep == 0:
             # setting up the path to save results plots in
             self.plotsfolderpth = join(self.wrkspc, 'runs')
@@ -2331,14 +2831,15 @@ class FloPyEnv():
                 makedirs(self.plotsfolderpth)
             if not exists(self.plotspth):
                 makedirs(self.plotspth)
+            self.animationWriter = get_writer(join(self.plotspth,
+                self.MODELNAME + '.gif'), mode='I')
 
-        plotfile = join(self.plotspth,
-                              self.MODELNAME + '_'
-                              + str(self.timeStep).zfill(len(str(abs(self.NAGENTSTEPS)))+1)
-                              + '.png'
-                              )
-        self.fig.savefig(plotfile, dpi=70)
-        self.plotfilesSaved.append(plotfile)
+        buffer = BytesIO()
+        self.fig.savefig(buffer, format='raw', dpi=dpi)
+        width, height = (self.fig.get_size_inches() * dpi).round().astype(int)
+        frame = frombuffer(buffer.getvalue(), dtype=uint8).reshape(
+            height, width, 4)
+        self.animationWriter.append_data(frame)
 
     def renderClearAxes(self):
         """Clear all axis after timestep."""
@@ -2356,108 +2857,78 @@ class FloPyEnv():
                 self.ax3.clear()
             except: pass
 
-    def renderAnimationFromFiles(self):
-        """Create animation of fulll game run.
-        Code taken from and credit to:
+    def renderCloseAnimation(self):
+        """Finish animation of full game run.
+        Code modified after and credit to:
         https://stackoverflow.com/questions/753190/programmatically-generate-video-or-animated-gif-in-python
         """
-        with get_writer(join(self.wrkspc, 'runs',
-            self.ANIMATIONFOLDER, self.MODELNAME + '.gif'), mode='I') as writer:
-            for filename in self.plotfilesSaved:
-                image = imread(filename)
-                writer.append_data(image)
-                remove(filename)
+        self.animationWriter.close()
 
     def cellInfoFromCoordinates(self, coords):
         """Determine layer, row and column corresponding to model location."""
 
-        x, y, z = coords[0], coords[1], coords[2]
-
-        layer = int(ceil((z + self.zBot) / self.dVer))
-        column = int(ceil((x + self.minX) / self.dCol))
-        row = int(ceil((y + self.minY) / self.dRow))
-
-        # in cases where coordinates are 0, this replacement is necessary
-        if layer == 0:
-            layer = 1
-        if column == 0:
-            column = 1
-        if row == 0:
-            row = 1
-        # in cases where coordinates are slightly exceeding boundaries (e.g.
-        # rounding or inaccurate surrogate prediction), this replacement is necessary
-        if layer > self.nLay:
-            layer = self.nLay
-        if column > self.nCol:
-            column = self.nCol
-        if row > self.nRow:
-            row = self.nRow
+        layer, column, row = cellFromCoordinates(coords[0], coords[1],
+            coords[2], self.minX, self.minY, self.zBot, self.dCol, self.dRow,
+            self.dVer, self.nLay, self.nRow, self.nCol)
 
         return layer, column, row
 
-    def surroundingHeadsFromCoordinates(self, coords, distance):
-        """Determine hydraulic head of surrounding cells. Returns head of the
-        same cell in the case of surrounding edges of the environment domain.
+    def cellsFromCoordinates(self, coords):
+        """Determine layers, columns and rows corresponding to an array of
+        model locations, as in cellInfoFromCoordinates.
         """
 
-        # lc, cc, rc = self.cellInfoFromCoordinates([coords[0], coords[1], coords[2]])
+        layers = ceil((coords[:, 2] + self.zBot) / self.dVer).astype(int32)
+        columns = ceil((coords[:, 0] + self.minX) / self.dCol).astype(int32)
+        rows = ceil((coords[:, 1] + self.minY) / self.dRow).astype(int32)
 
-        headsSurrounding = []
-        for rIdx in range(3):
-            for cIdx in range(3):
-                # if rIdx or cIdx = 0, this is the previous, = 1 is the current and thus skipped if both, and = 2 is the next
+        # replacing zero or slightly exceeding cells as for single locations
+        clip(layers, 1, self.nLay, out=layers)
+        clip(columns, 1, self.nCol, out=columns)
+        clip(rows, 1, self.nRow, out=rows)
 
-                if (rIdx == 1) and (cIdx == 1):
-                    # ignoring if coordinates are at the center of the 3x3 cube looked at
-                    pass
-                else:
-                    rDistance = distance * (rIdx-1)
-                    cDistance = distance * (cIdx-1)
-                    coordX, coordY, coordZ = coords[0]+cDistance, coords[1]+rDistance, coords[2]
-                    adjustedCoords = False
-                    if coords[0]+cDistance > self.extentX:
-                        coordX = self.extentX
-                        adjustedCoords = True
-                    if coords[0]+cDistance < self.minX:
-                        coordX = self.minX
-                        adjustedCoords = True
-                    if coords[1]+rDistance > self.extentY:
-                        coordY = self.extentY
-                        adjustedCoords = True
-                    if coords[1]+rDistance < self.minY:
-                        coordY = self.minY
-                        adjustedCoords = True
-                    
-                    # index 837 is out of bounds for axis 2 with size 800 Something went wrong. Maybe the queried coordinates reside outside the model domain?
-                    if adjustedCoords:
-
-                        # This can lead to r-1 = -1?
-
-                        l, c, r = self.cellInfoFromCoordinates([coordX, coordY, coordZ])
-                        headsSurrounding.append(self.heads[l-1, r-1, c-1])
-                    if not adjustedCoords:
-                        try:
-                            l, c, r = self.cellInfoFromCoordinates([coords[0]+cDistance, coords[1]+rDistance, coords[2]])
-                            # headsSurrounding.append(self.heads[l-1, r-rIdx, c-cIdx])
-                            headsSurrounding.append(self.heads[l-1, r-1, c-1])
-                        except Exception as e:
-                            # if surrounding head does not exist near domain boundary
-                            # check if r or c out of range?
-                            # headsSurrounding.append(self.heads[lc-1, rc-1, cc-1])
-                            print(e)
-                            print('Something went wrong. Maybe the queried coordinates reside outside the model domain?')
-
-        return headsSurrounding
+        return layers, columns, rows
+
+    def actionHeads(self):
+        """Return heads set by actions, observed ahead of other heads."""
+
+        if self.ENVTYPE == '1':
+            return [self.actionValueNorth, self.actionValueSouth]
+        elif self.ENVTYPE == '2':
+            # this can cause issues with unit testing, as model expects different input 
+            return [self.actionValue]
+        elif self.ENVTYPE == '3':
+            return [self.headSpecNorth, self.headSpecSouth]
+
+    def observeHeads(self):
+        """Gather observed heads into a single preallocated vector.
+
+        Contains heads set by actions, the head at the particle and heads
+        surrounding particle and well at increasing distances.
+        """
+
+        headsAction = self.actionHeads()
+        nAction = len(headsAction)
+        nParticle = len(self.neighborOffsetsParticle)
+        heads = zeros(nAction + nParticle + len(self.neighborOffsetsWell))
+        heads[:nAction] = headsAction
+        # note: it sees the surrounding heads of the particle and the well
+        coords = repeat(array([self.particleCoords, self.wellCoords],
+            dtype=float), [nParticle, len(self.neighborOffsetsWell)], axis=0)
+        coords[:nParticle, :2] += self.neighborOffsetsParticle
+        coords[nParticle:, :2] += self.neighborOffsetsWell
+        # returning head of the edge cell if surroundings exceed the domain
+        clip(coords[:, 0], self.minX, self.extentX, out=coords[:, 0])
+        clip(coords[:, 1], self.minY, self.extentY, out=coords[:, 1])
+        layers, columns, rows = self.cellsFromCoordinates(coords)
+        heads[nAction:] = self.heads[layers-1, rows-1, columns-1]
+
+        return heads
 
     def calculatePathLength(self, x, y):
         """Calculate length of advectively traveled path."""
 
-        n = len(x)
-        lv = []
-        for i in range(n):
-            if i > 0:
-                lv.append(sqrt((x[i] - x[i - 1])**2 + (y[i] - y[i - 1])**2))
-        pathLength = sum(lv)
+        pathLength = hypot(diff(x), diff(y)).sum()
 
         return pathLength
 
@@ -2497,28 +2968,61 @@ class FloPyEnv():
                 if self.wellY < self.extentY - self.dRow - self.actionRange:
                     self.actionValueY = self.wellY + self.actionRange
 
+    def normalizeStresses(self):
+        """Normalize stresses of the current step, being the specified heads
+        followed by well rate and coordinates.
+        """
+
+        if self.ENVTYPE == '1':
+            headsStress = [self.actionValueSouth, self.actionValueNorth]
+        elif self.ENVTYPE == '2':
+            headsStress = [self.actionValue]
+        elif self.ENVTYPE == '3':
+            headsStress = [self.headSpecSouth, self.headSpecNorth]
+        stresses = array(headsStress + [self.wellQ, self.wellX, self.wellY,
+            self.wellZ], dtype=float)
+        stresses -= self.stressesOffset
+        stresses *= self.stressesScale
+
+        return stresses
+
+    def normalizeHeads(self, heads):
+        """Normalize heads to the range of the environment, allocating only
+        the returned array as it can be kept in time series of a game.
+        Heads are returned in single precision, as simulated by MODFLOW.
+        """
+
+        headsNormalized = subtract(heads, self.minH, dtype=float32)
+        headsNormalized *= self.invH
+
+        return headsNormalized
+
     def observationsDictToVector(self, observationsDict):
-        """Convert dictionary of observations to list."""
-        observationsVector = []
-        if 'particleCoords' in observationsDict.keys():
-            for obs in observationsDict['particleCoords']:
-                observationsVector.append(obs)
+        """Convert dictionary of observations to a flat array."""
+        observationsParts = []
         # full field not longer part of reported state
-        # for obs in observationsDict['headsSampledField'].flatten().flatten():
-        #     observationsVector.append(obs)
-        if 'heads' in observationsDict.keys():
-            for obs in observationsDict['heads']:
-                observationsVector.append(obs)
-        # print('len(observationsDict[heads])', len(observationsDict['heads']))
-        if 'wellQ' in observationsDict.keys():
-            observationsVector.append(observationsDict['wellQ'])
-        if 'wellCoords' in observationsDict.keys():
-            for obs in observationsDict['wellCoords']:
-                observationsVector.append(obs)
-        return observationsVector
+        # 'headsSampledField' is hence not among the concatenated keys
+        for key in ['particleCoords', 'heads', 'wellQ', 'wellCoords']:
+            if key in observationsDict:
+                observationsParts.append(ravel(observationsDict[key]))
+        return concatenate(observationsParts)
+
+    def observationsDictToArray(self, observationsDict, dtype=None):
+        """Convert dictionary of observations to a flat array in a single
+        concatenation, as observationsDictToVector for observed heads.
+        """
+
+        observationsArray = concatenate((observationsDict['particleCoords'],
+            observationsDict['heads'], [observationsDict['wellQ']],
+            observationsDict['wellCoords']))
+        if dtype is not None:
+            observationsArray = observationsArray.astype(dtype, copy=False)
+
+        return observationsArray
 
     def observationsVectorToDict(self, observationsVector):
-        """Convert list of observations to dictionary."""
+        """Convert list or array of observations to dictionary."""
+        observationsVector = asarray(observationsVector)
         observationsDict = {}
         observationsDict['particleCoords'] = observationsVector[:3]
         observationsDict['heads'] = observationsVector[3:-4]
@@ -2527,8 +3031,6 @@ class FloPyEnv():
         return observationsDict
 
     def unnormalize(self, data):
-        from numpy import multiply
-
         keys = data.keys()
         if 'particleCoords' in keys:
             data['particleCoords'] = multiply(data['particleCoords'],
@@ -2561,18 +3063,19 @@ class FloPyEnvSurrogate():
             initWithSolution=False):
         """Constructor."""
 
+        self.SURROGATESIMULATOR = SURROGATESIMULATOR
         self.ENVTYPE = ENVTYPE
         self.MODELNAME = 'FloPyArcade' if (MODELNAME==None) else MODELNAME
         self.NAGENTSTEPS = NAGENTSTEPS
-        self.info = ''
-        self.comments = ''
-        self.done = False
 
 
         # CURRENTLY SET MANUALLY FOR TESTING
         self.initWithSolution = True
         self.useBestEnsembleSteady = False
         self.useBestEnsembleTransient = False
+        # single surrogate models with weights quantized to 8 bit, trading
+        # little accuracy for less memory traffic per prediction
+        self.quantizeSurrogates = False
 
 
         self.wrkspc = dirname(abspath(__file__))
@@ -2582,36 +3085,30 @@ class FloPyEnvSurrogate():
 
         if type(SURROGATESIMULATOR[0]) == str:
             # Note: loading these models is a bottleneck
-            t0 = time()
 
             # with open(join(self.wrkspc, 'dev', SURROGATESIMULATOR[0] + '.json')) as json_file:
             #     json_config = json_file.read()
             # self.modelSteady = model_from_json(json_config)
             # self.modelSteady.load_weights(join(self.wrkspc, 'dev', SURROGATESIMULATOR[0] + 'Weights.h5'))
 
-            # print('time for loading steady-state surrogate model', time() - t0)
-            t1 = time()
-
             # with open(join(self.wrkspc, 'dev', SURROGATESIMULATOR[1] + '.json')) as json_file:
             #     json_config = json_file.read()
             # self.modelTransient = model_from_json(json_config)
             # self.modelTransient.load_weights(join(self.wrkspc, 'dev', SURROGATESIMULATOR[1] + 'Weights.h5'))
 
+            if self.quantizeSurrogates:
+                loadSingleModel = self.loadSurrogateInterpreter
+            else:
+                loadSingleModel = self.loadSurrogateModelCached
             if not self.useBestEnsembleSteady:
                 if not self.initWithSolution:
-                    with open(join(self.wrkspc, 'dev', SURROGATESIMULATOR[0] + '.json')) as json_file:
-                        json_config = json_file.read()
-                    self.modelSteady = model_from_json(json_config)
-                    self.modelSteady.load_weights(join(self.wrkspc, 'dev', SURROGATESIMULATOR[0] + 'Weights.h5'))
+                    self.modelSteady = loadSingleModel(
+                        join(self.wrkspc, 'dev', SURROGATESIMULATOR[0] + '.json'))
             if not self.useBestEnsembleTransient:
-                with open(join(self.wrkspc, 'dev', 'bestModelUnweightedParticle' + '.json')) as json_file:
-                    json_config = json_file.read()
-                self.modelTransientParticle = model_from_json(json_config)
-                self.modelTransientParticle.load_weights(join(self.wrkspc, 'dev', 'bestModelUnweightedParticle' + 'Weights.h5'))
-                with open(join(self.wrkspc, 'dev', 'bestModelUnweightedHeads' + '.json')) as json_file:
-                    json_config = json_file.read()
-                self.modelTransientHeads = model_from_json(json_config)
-                self.modelTransientHeads.load_weights(join(self.wrkspc, 'dev', 'bestModelUnweightedHeads' + 'Weights.h5'))
+                self.modelTransientParticle = loadSingleModel(
+                    join(self.wrkspc, 'dev', 'bestModelUnweightedParticle' + '.json'))
+                self.modelTransientHeads = loadSingleModel(
+                    join(self.wrkspc, 'dev', 'bestModelUnweightedHeads' + '.json'))
 
             if self.useBestEnsembleTransient or self.useBestEnsembleSteady:
                 self.models = {}
@@ -2634,20 +3131,44 @@ class FloPyEnvSurrogate():
                     filehandler.close()
 
                     for model in ensemble:
-                        with open(model) as json_file:
-                            json_config = json_file.read()
-                        modelTemp = model_from_json(json_config)
-                        modelTemp.load_weights(model.replace('.json', 'Weights.h5'))
-                        self.models[suffix + '_ensembleModels'].append(modelTemp)
+                        self.models[suffix + '_ensembleModels'].append(
+                            self.loadSurrogateModelCached(model))
+
+                    # member weights of transient ensembles are stored nested
+                    weights = self.models[suffix + '_ensembleWeights']
+                    if suffix != 'UnweightedInitial':
+                        weights = weights[0]
+                    ensembleKey = tuple(ensemble)
+                    if ensembleKey not in surrogateEnsemblePredictsCache:
+                        surrogateEnsemblePredictsCache[ensembleKey] = (
+                            self.compileEnsemblePredictFunction(
+                            self.models[suffix + '_ensembleModels'], weights))
+                    self.models[suffix + '_ensemblePredict'] = (
+                        surrogateEnsemblePredictsCache[ensembleKey])
 
-            # print('time for loading transient surrogate model', time() - t1)
         else:
             self.modelSteady = SURROGATESIMULATOR[0]
             self.modelTransient = SURROGATESIMULATOR[1]
 
         self.nLay, self.nRow, self.nCol = 1, 100, 100
         FloPyEnv.defineEnvironment(self)
-        self.headsCollection, self.particleCoordsCollection = [], []
+        self.inputVectorHeads, self.inputVectorParticle = None, None
+        self.transientPredict = None
+
+        self.initializeGame(_seed)
+
+    def initializeGame(self, _seed=None):
+        """Initialize a new game with random action, particle and well.
+
+        Surrogate models and grid of the environment are kept, so that
+        resetting only repeats the game-dependent part of construction.
+        """
+
+        self.info, self.comments = '', ''
+        self.done = False
+        # only the two most recent states are ever needed as model inputs
+        self.headsCollection = deque(maxlen=2)
+        self.particleCoordsCollection = deque(maxlen=2)
 
         self._SEED = _seed
         if self._SEED is not None:
@@ -2677,18 +3198,7 @@ class FloPyEnvSurrogate():
         for i in ['x', 'y', 'z']:
             self.trajectories[i] = []
 
-        if self.ENVTYPE == '1':
-            self.stressesVectorNormalized = [self.actionValueSouth/self.maxH, self.actionValueNorth/self.maxH,
-                                             self.wellQ/self.minQ, self.wellX/(self.minX+self.extentX),
-                                             self.wellY/(self.minX+self.extentX), self.wellZ/(self.minX+self.extentX)]
-        elif self.ENVTYPE == '2':
-            self.stressesVectorNormalized = [self.actionValue,
-                                             self.wellQ/self.minQ, self.wellX/(self.minX+self.extentX),
-                                             self.wellY/(self.minX+self.extentX), self.wellZ/(self.minX+self.extentX)]
-        elif self.ENVTYPE == '3':
-            self.stressesVectorNormalized = [self.headSpecSouth/self.maxH, self.headSpecNorth/self.maxH,
-                                             self.wellQ/self.minQ, self.wellX/(self.minX+self.extentX),
-                                             self.wellY/(self.minX+self.extentX), self.wellZ/(self.minX+self.extentX)]
+        self.stressesVectorNormalized = self.normalizeStresses()
 
         if self.initWithSolution:
             # initialization with simulated solution
@@ -2702,7 +3212,9 @@ class FloPyEnvSurrogate():
             self.heads = envSimulated.heads
             self.headsInitial = envSimulated.heads
             self.observationsNormalized, self.observationsVector = envSimulated.observationsNormalized, envSimulated.observationsVector
-            self.observationsVectorNormalized, self.timeStepDuration = envSimulated.observationsVectorNormalized, envSimulated.timeStepDuration
+            self.observationsVectorNormalized, self.timeStepDurationTotal = envSimulated.observationsVectorNormalized, envSimulated.timeStepDurationTotal
+            # removing model files, as the simulated game is never concluded
+            envSimulated.removeWorkspace()
 
         if not self.initWithSolution:
             # initialization with surrogate solution
@@ -2713,17 +3225,13 @@ class FloPyEnvSurrogate():
 
     def stepInitial(self):
 
-        inputVector = array(list(divide(self.particleCoords, self.minX + self.extentX)) + self.stressesVectorNormalized)
+        inputVector = array(list(multiply(self.particleCoords, self.invX)) + self.stressesVectorNormalized)
         if not self.useBestEnsembleSteady:
-            self.headsNormalized = self.modelSteady.predict(inputVector.reshape(1, -1))
+            self.headsNormalized = self.predictCompiled(self.modelSteady, inputVector)
 
         if self.useBestEnsembleSteady:
-            for i, model in enumerate(self.models['UnweightedInitial' + '_ensembleModels']):
-                weight = self.models['UnweightedInitial' + '_ensembleWeights'][i]
-                if i == 0:
-                    self.headsNormalized = model.predict(inputVector.reshape(1, -1)) * weight
-                else:
-                    self.headsNormalized = add(self.headsNormalized, model.predict(inputVector.reshape(1, -1)) * weight)
+            self.headsNormalized = self.predictEnsembleCompiled(
+                'UnweightedInitial', inputVector)
 
         predictions = {}
         predictions['heads'] = array(self.headsNormalized).flatten()
@@ -2743,39 +3251,26 @@ class FloPyEnvSurrogate():
 
         self.observations = {}
         self.observations['particleCoords'] = self.particleCoords
-        
-        lParticle, cParticle, rParticle = FloPyEnv.cellInfoFromCoordinates(self,
-            [self.particleCoords[0], self.particleCoords[1], self.particleCoords[2]])
-
-        if self.ENVTYPE == '1':
-            self.observations['heads'] = [self.actionValueNorth,
-                                          self.actionValueSouth]
-        elif self.ENVTYPE == '2':
-            # this can cause issues with unit testing, as model expects different input 
-            self.observations['heads'] = [self.actionValue]
-        elif self.ENVTYPE == '3':
-            self.observations['heads'] = [self.headSpecNorth,
-                                          self.headSpecSouth]
 
         self.observations['heads'] = list(self.heads)
         self.observations['wellQ'] = self.wellQ
         self.observations['wellCoords'] = self.wellCoords
 
         self.observationsNormalized = {}
-        self.observationsNormalized['particleCoords'] = divide(
-            copy(self.particleCoords), self.minX + self.extentX)
-        self.observationsNormalized['heads'] = divide(self.observations['heads'],
-            self.maxH)
-        self.observationsNormalized['wellQ'] = self.wellQ / self.minQ
-        self.observationsNormalized['wellCoords'] = divide(
-            self.wellCoords, self.minX + self.extentX)
-
-        self.observationsVector = FloPyEnv.observationsDictToVector(self,
+        self.observationsNormalized['particleCoords'] = multiply(
+            self.particleCoords, self.invX)
+        self.observationsNormalized['heads'] = multiply(self.observations['heads'],
+            self.invMaxH)
+        self.observationsNormalized['wellQ'] = self.wellQ * self.invQ
+        self.observationsNormalized['wellCoords'] = multiply(
+            self.wellCoords, self.invX)
+
+        self.observationsVector = FloPyEnv.observationsDictToArray(self,
             self.observations)
-        self.observationsVectorNormalized = FloPyEnv.observationsDictToVector(self,
-            self.observationsNormalized)
+        self.observationsVectorNormalized = FloPyEnv.observationsDictToArray(self,
+            self.observationsNormalized, dtype=float32)
 
-        self.timeStepDuration = []
+        self.timeStepDurationTotal = 0.
 
     def step(self, observations, action, rewardCurrent):
 
@@ -2791,10 +3286,13 @@ class FloPyEnvSurrogate():
         elif self.ENVTYPE == '3':
             FloPyEnv.getActionValue(self, action)
 
-        observations = FloPyEnv.observationsVectorToDict(self, observations)
-        observations = FloPyEnv.unnormalize(self, observations)
-        self.particleCoordsBefore = observations['particleCoords']
-        self.headsBefore = observations['heads']
+        # observations are fed normalized, as the models take them, hence
+        # only particle coordinates are unnormalized for the trajectories
+        observationsNormalizedBefore = FloPyEnv.observationsVectorToDict(self,
+            observations)
+        self.particleCoordsBefore = multiply(
+            observationsNormalizedBefore['particleCoords'],
+            self.minX + self.extentX)
         self.rewardCurrent = rewardCurrent
 
         # this seems irrelevant here, as surrogate model needs no reprojection
@@ -2806,21 +3304,11 @@ class FloPyEnvSurrogate():
         FloPyEnv.initializeState(self, self.state)
         FloPyEnv.updateWellRate(self)
 
-        self.stressesVectorNormalizedPre = copy(self.stressesVectorNormalized)
+        # no copy needed, as stresses are built into a new list every step
+        self.stressesVectorNormalizedPre = self.stressesVectorNormalized
         # inputDataTemp = states[i-1][:-4] + stresses[i-1][-3:] + states[i][:-4] + stresses[i][-3:]
 
-        if self.ENVTYPE == '1':
-            self.stressesVectorNormalized = [self.actionValueSouth/self.maxH, self.actionValueNorth/self.maxH,
-                                             self.wellQ/self.minQ, self.wellX/(self.minX+self.extentX),
-                                             self.wellY/(self.minX+self.extentX), self.wellZ/(self.minX+self.extentX)]
-        elif self.ENVTYPE == '2':
-            self.stressesVectorNormalized = [self.actionValue,
-                                             self.wellQ/self.minQ, self.wellX/(self.minX+self.extentX),
-                                             self.wellY/(self.minX+self.extentX), self.wellZ/(self.minX+self.extentX)]
-        elif self.ENVTYPE == '3':
-            self.stressesVectorNormalized = [self.headSpecSouth/self.maxH, self.headSpecNorth/self.maxH,
-                                             self.wellQ/self.minQ, self.wellX/(self.minX+self.extentX),
-                                             self.wellY/(self.minX+self.extentX), self.wellZ/(self.minX+self.extentX)]
+        self.stressesVectorNormalized = self.normalizeStresses()
 
 
 
@@ -2840,88 +3328,90 @@ class FloPyEnvSurrogate():
             # statesBefore = list(divide(self.particleCoords, self.minX + self.extentX)) + list(divide(self.heads, self.maxH))
             # stressesBefore = list(self.stressesVectorNormalized)
 
-        statesBefore = list(divide(self.particleCoordsBefore, self.minX + self.extentX)) + list(divide(self.headsBefore, self.maxH))
-        stressesBefore = list(self.stressesVectorNormalizedPre)
+        # input vectors filled in place, as the models consume them at once
+        # inputs of heads: states and stresses before, stresses now
+        # inputs of particle: as of heads, with states now before stresses now
+        nHeads = len(observationsNormalizedBefore['heads'])
+        nStresses = len(self.stressesVectorNormalized)
+        nInputsBefore = 3 + nHeads + nStresses
+        if self.inputVectorHeads is None:
+            self.inputVectorHeads = empty((1, nInputsBefore + nStresses),
+                dtype=float32)
+            self.inputVectorParticle = empty((1, nInputsBefore + nHeads +
+                nStresses), dtype=float32)
+        inputVectorHeads = self.inputVectorHeads[0]
+        inputVectorParticle = self.inputVectorParticle[0]
+        inputVectorHeads[:3] = observationsNormalizedBefore['particleCoords']
+        inputVectorHeads[3:3+nHeads] = observationsNormalizedBefore['heads']
+        inputVectorHeads[3+nHeads:nInputsBefore] = self.stressesVectorNormalizedPre
+        inputVectorHeads[nInputsBefore:] = self.stressesVectorNormalized
         # statesNow = list(divide(self.particleCoords, self.minX + self.extentX)) + list(divide(self.heads, self.maxH))
-        stressesNow = list(self.stressesVectorNormalized)
 
         # print('self.observations[heads]', self.observations['heads'])
         # print('self.timeStep', self.timeStep)
 
 
-        t0 = time()
         # predict_on_batch seems a factor of 10 faster
         # prediction = self.modelTransient.predict_on_batch(inputVector.reshape(1, -1))
 
         self.observations, self.observationsNormalized, predictions = {}, {}, {}
-        inputVectorHeads = array(statesBefore + stressesBefore + stressesNow)
-        # print('self.timeStep', self.timeStep)
-        # print(inputVectorHeads)
-        if self.useBestEnsembleTransient:
-            # print('debug lens', len(statesBeforeBefore), len(stressesBeforeBefore), len(statesBefore), len(stressesBefore))
-            for i, model in enumerate(self.models['UnweightedHeads' + '_ensembleModels']):
-                # at the moment any weight is the same, so taking the ith is okay
-                # if differentiated, then needs to look at different indices
-                weight = self.models['UnweightedHeads' + '_ensembleWeights'][0][i]
-                # print('debug weight', weight)
-                # did I apply the weights at prediction appropriately??
-                if i == 0:
-                    t0 = time()
-                    predictionHeads = model.predict(inputVectorHeads.reshape(1, -1)) * weight
-                    # print('debug single prediction time', time() - t0)
-                else:
-                    predictionHeads = add(predictionHeads, model.predict(inputVectorHeads.reshape(1, -1)) * weight)
-        if not self.useBestEnsembleTransient:
-            predictionHeads = self.modelTransientHeads.predict(inputVectorHeads.reshape(1, -1), batch_size=1)
-        predictions['heads'] = array(predictionHeads).flatten()        
-
-        self.observations['heads'] = copy(list(predictions['heads']))
-        # print(FloPyEnv.unnormalize(self, self.observations))
-        self.observations['heads'] = FloPyEnv.unnormalize(self, self.observations)['heads']
-        if self.ENVTYPE == '1':
-            self.observations['heads'][0] = self.actionValueNorth
-            self.observations['heads'][1] = self.actionValueSouth
-        elif self.ENVTYPE == '2':
-            # this can cause issues with unit testing, as model expects different input 
-            self.observations['heads'][0] = self.actionValue
-        elif self.ENVTYPE == '3':
-            self.observations['heads'][0] = self.headSpecNorth
-            self.observations['heads'][1] = self.headSpecSouth
-        # # note: it sees the surrounding heads of the particle and the well
-        # overwriting if hitting boundary
-        self.observations['heads'][3:3+8] = self.surroundingHeadsFromCoordinates(self.particleCoords,
-            distance=0.5*self.wellRadius, heads=self.observations['heads'][3:3+8])
-        self.observations['heads'][3+8:3+2*8] = self.surroundingHeadsFromCoordinates(self.particleCoords,
-            distance=1.5*self.wellRadius, heads=self.observations['heads'][3+8:3+2*8])
-        self.observations['heads'][3+2*8:3+3*8] = self.surroundingHeadsFromCoordinates(self.particleCoords,
-            distance=2.5*self.wellRadius, heads=self.observations['heads'][3+2*8:3+3*8])
-        self.observations['heads'][3+3*8:3+4*8] = self.surroundingHeadsFromCoordinates(self.wellCoords,
-            distance=1.5*self.wellRadius, heads=self.observations['heads'][3+3*8:3+4*8])
-        self.observations['heads'][3+4*8:3+5*8] = self.surroundingHeadsFromCoordinates(self.wellCoords,
-            distance=2.0*self.wellRadius, heads=self.observations['heads'][3+4*8:3+5*8])
-
-        # statesNow contains particle heads predictions?
-
-        # self.observations['heads'] = FloPyEnv.unnormalize(self, self.observations['heads'])
-        statesNow = list(divide(self.observations['heads'], self.maxH))
 
-
-        inputVectorParticle = array(statesBefore + stressesBefore + statesNow + stressesNow)
-        if self.useBestEnsembleTransient:
-            for i, model in enumerate(self.models['UnweightedParticle' + '_ensembleModels']):
+        # heads overriding predictions are known ahead of them, being heads
+        # set by actions and surrounding heads beyond the domain edges
+        headsOverride = full(nHeads, nan)
+        headsAction = FloPyEnv.actionHeads(self)
+        headsOverride[:len(headsAction)] = headsAction
+        # # note: it sees the surrounding heads of the particle and the well
+        # gathering all surroundings of particle and well at once
+        nParticle = len(self.neighborOffsetsParticle) - 1
+        surroundings = repeat(array([self.particleCoords[:3],
+            self.wellCoords[:3]], dtype=float),
+            [nParticle, len(self.neighborOffsetsWell)], axis=0)
+        surroundings[:nParticle, :2] += self.neighborOffsetsParticle[1:]
+        surroundings[nParticle:, :2] += self.neighborOffsetsWell
+        nSurroundings = len(surroundings)
+        self.surroundingHeadsFromCoordinates(surroundings,
+            heads=headsOverride[3:3+nSurroundings])
+        headsOverridden = ~isnan(headsOverride)
+
+        if self.transientPredict is None:
+            self.transientPredict = self.compileTransientPredictFunction(
+                nInputsBefore, nHeads)
+        if self.transientPredict is not False:
+            # predicting heads and particle within a single inference graph
+            predictionHeads, predictionParticle = self.transientPredict(
+                self.inputVectorHeads,
+                (headsOverride * self.invMaxH).astype(float32).reshape(1, -1))
+            predictionHeads = predictionHeads.numpy()
+            predictionParticle = predictionParticle.numpy()
+        else:
+            if self.useBestEnsembleTransient:
                 # at the moment any weight is the same, so taking the ith is okay
                 # if differentiated, then needs to look at different indices
-                weight = self.models['UnweightedParticle' + '_ensembleWeights'][0][i]
-                if i == 0:
-                    predictionParticle = model.predict(inputVectorParticle.reshape(1, -1)) * weight
-                else:
-                    predictionParticle = add(predictionParticle, model.predict(inputVectorParticle.reshape(1, -1)) * weight)
-        if not self.useBestEnsembleTransient:
-            predictionParticle = self.modelTransientParticle.predict(inputVectorParticle.reshape(1, -1), batch_size=1)
-        predictions['particleCoords'] = array(predictionParticle).flatten()
-
-        # print('debug actual predict time', time() - t0)
-        # print('debug predict time', time() - t0)
+                predictionHeads = self.predictEnsembleCompiled(
+                    'UnweightedHeads', self.inputVectorHeads)
+            if not self.useBestEnsembleTransient:
+                predictionHeads = self.predictCompiled(
+                    self.modelTransientHeads, self.inputVectorHeads)
+        predictions['heads'] = predictionHeads.ravel()
+
+        # unnormalizing allocates the observed heads apart from predictions
+        self.observations['heads'] = multiply(predictions['heads'], self.maxH)
+        self.observations['heads'][headsOverridden] = headsOverride[
+            headsOverridden]
+
+        if self.transientPredict is False:
+            inputVectorParticle[:nInputsBefore] = inputVectorHeads[:nInputsBefore]
+            multiply(self.observations['heads'], self.invMaxH,
+                out=inputVectorParticle[nInputsBefore:nInputsBefore+nHeads])
+            inputVectorParticle[nInputsBefore+nHeads:] = self.stressesVectorNormalized
+            if self.useBestEnsembleTransient:
+                predictionParticle = self.predictEnsembleCompiled(
+                    'UnweightedParticle', self.inputVectorParticle)
+            if not self.useBestEnsembleTransient:
+                predictionParticle = self.predictCompiled(
+                    self.modelTransientParticle, self.inputVectorParticle)
+        predictions['particleCoords'] = predictionParticle.ravel()
 
         predictions = FloPyEnv.unnormalize(self, predictions)
         self.particleCoords = predictions['particleCoords']
@@ -2929,7 +3419,7 @@ class FloPyEnvSurrogate():
 
         # observationsDictToVector
 
-        self.particleCoordsAfter = copy(self.particleCoords)
+        self.particleCoordsAfter = self.particleCoords.copy()
         # FloPyEnv.unnormalize(self, copy(predictions))['particleCoords']
         # self.particleCoords = predictions['particleCoords'] * (self.minX + self.extentX)
         # self.particleCoordsAfter = predictions['particleCoords'] * (self.minX + self.extentX)
@@ -2957,78 +3447,45 @@ class FloPyEnvSurrogate():
             self.state['actionValueY'] = self.actionValueY
 
         self.observations['particleCoords'] = self.particleCoords
-        lParticle, cParticle, rParticle = self.cellInfoFromCoordinates(
-            [self.particleCoords[0], self.particleCoords[1], self.particleCoords[2]])
-        lWell, cWell, rWell = self.cellInfoFromCoordinates(
-            [self.wellX, self.wellY, self.wellZ])
 
         # self.observations['heads'] here
 
         self.observations['wellQ'] = self.wellQ
         self.observations['wellCoords'] = self.wellCoords
-        self.observationsNormalized['particleCoords'] = divide(
-            copy(self.particleCoordsAfter), self.minX + self.extentX)
+        self.observationsNormalized['particleCoords'] = multiply(
+            self.particleCoordsAfter, self.invX)
         # self.observationsNormalized['headsSampledField'] = divide(self.observations['headsSampledField'],
         #     self.maxH)
-        self.observationsNormalized['heads'] = divide(self.observations['heads'],
-            self.maxH)
-        self.observationsNormalized['wellQ'] = self.wellQ / self.minQ
-        self.observationsNormalized['wellCoords'] = divide(
-            self.wellCoords, self.minX + self.extentX)
+        self.observationsNormalized['heads'] = multiply(self.observations['heads'],
+            self.invMaxH)
+        self.observationsNormalized['wellQ'] = self.wellQ * self.invQ
+        self.observationsNormalized['wellCoords'] = multiply(
+            self.wellCoords, self.invX)
 
-        self.observationsVector = FloPyEnv.observationsDictToVector(self,
+        self.observationsVector = FloPyEnv.observationsDictToArray(self,
             self.observations)
-        self.observationsVectorNormalized = FloPyEnv.observationsDictToVector(self,
-            self.observationsNormalized)
-
-        if self.observations['particleCoords'][0] >= self.extentX - self.dCol:
-            self.success = True
-        else:
-            self.success = False
-
-        # checking if particle is within horizontal distance of well
-        dx = self.particleCoords[0] - self.wellCoords[0]
-        # why would the correction for Y coordinate be necessary
-        dy = self.extentY - self.particleCoords[1] - self.wellCoords[1]
-        self.distanceWellParticle = sqrt(dx**2 + dy**2)
-        if self.distanceWellParticle <= self.wellRadius:
-            self.done = True
-            self.reward = (self.rewardCurrent) * (-1.0)
-
-        # checking if particle has reached eastern boundary
-        if self.particleCoordsAfter[0] >= self.minX + self.extentX - self.dCol:
-            self.done = True
-
-        # checking if particle has returned to western boundary
-        if self.particleCoordsAfter[0] <= self.minX + self.dCol:
-            self.done = True
-            self.reward = (self.rewardCurrent) * (-1.0)
-
-        if self.ENVTYPE == '1' or self.ENVTYPE == '3':
-            # checking if particle has reached northern boundary
-            if self.particleCoordsAfter[1] >= self.minY + self.extentY - self.dRow:
-            # if self.particleCoordsAfter[1] >= self.minY + \
-            #         self.extentY - self.dRow:
-                self.done = True
-                self.reward = (self.rewardCurrent) * (-1.0)
-
-        # checking if particle has reached southern boundary
-        if self.particleCoordsAfter[1] <= self.minY + self.dRow:
-            self.done = True
+        self.observationsVectorNormalized = FloPyEnv.observationsDictToArray(self,
+            self.observationsNormalized, dtype=float32)
+
+        self.success = bool(self.particleCoords[0] >= self.extentX - self.dCol)
+
+        # checking if particle reached the well, a boundary or the step limit
+        self.done, penalty = gameTermination(
+            self.particleCoords[0], self.particleCoords[1],
+            self.particleCoordsAfter[0], self.particleCoordsAfter[1],
+            self.wellCoords[0], self.wellCoords[1], self.minX, self.minY,
+            self.extentX, self.extentY, self.dCol, self.dRow,
+            self.wellRadiusSquared, self.ENVTYPE == '1' or self.ENVTYPE == '3',
+            bool(self.done), self.timeStep, self.maxSteps)
+        if penalty:
             self.reward = (self.rewardCurrent) * (-1.0)
 
-        # aborting game if a threshold of steps have been taken
-        if self.timeStep == self.maxSteps:
-            if self.done != True:
-                self.done = True
-                self.reward = (self.rewardCurrent) * (-1.0)
-
         self.rewardCurrent += self.reward
 
-        self.timeStepDuration.append(time() - t0total)
+        self.timeStepDurationTotal += time() - t0total
         # print('debug timeStepDuration', time() - t0total)
         # if self.done:
-        #     print('debug average timeStepDuration', mean(self.timeStepDuration))
+        #     print('debug average timeStepDuration', self.timeStepDurationTotal / self.timeStep)
         #     print('debug timeStep', self.timeStep)
         #     print('debug self.wellCoords', self.wellCoords)
 
@@ -3037,73 +3494,163 @@ class FloPyEnvSurrogate():
 
         return self.observations, self.reward, self.done, self.info
 
-    def surroundingHeadsFromCoordinates(self, coords, distance, heads):
-        """Determine hydraulic head of surrounding cells. Returns head of the
-        same cell in the case of surrounding edges of the environment domain.
+    def loadSurrogateModelCached(self, pathJson):
+        """Load surrogate model from architecture and weights files, once per
+        process and path.
         """
 
-        count = 0
-        for rIdx in range(3):
-            for cIdx in range(3):
-                # if rIdx or cIdx = 0, this is the previous, = 1 is the current and thus skipped if both, and = 2 is the next
-                if (rIdx == 1) and (cIdx == 1):
-                    # ignoring if coordinates are at the center of the 3x3 cube looked at
-                    pass
-                else:
-                    rDistance = distance * (rIdx-1)
-                    cDistance = distance * (cIdx-1)
-                    coordX, coordY, coordZ = coords[0]+cDistance, coords[1]+rDistance, coords[2]
-                    # if coords[0]+cDistance > self.extentX:
-                    #     heads[count] = self.headSpecEast
-                    # if coords[0]+cDistance < self.minX:
-                    #     heads[count] = self.headSpecWest
-                    # if coords[1]+rDistance > self.extentY:
-                    #     # initially heads[count] = self.headSpecNorth
-                    #     heads[count] = self.headSpecSouth
-                    # if coords[1]+rDistance < self.minY:
-                    #     # initially heads[count] = self.headSpecSouth
-                    #     heads[count] = self.headSpecNorth
-                    adjustedCoords = False
-                    if coords[0]+cDistance > self.extentX:
-                        coordX = self.extentX
-                        adjustedCoords = True
-                    if coords[0]+cDistance < self.minX:
-                        coordX = self.minX
-                        adjustedCoords = True
-                    # not sure if y replacement is proper or vice versa
-                    if coords[1]+rDistance > self.extentY:
-                        coordY = self.extentY
-                        adjustedCoords = True
-                    if coords[1]+rDistance < self.minY:
-                        coordY = self.minY
-                        adjustedCoords = True
-
-                    if adjustedCoords:
-                        l, c, r = self.cellInfoFromCoordinates([coordX, coordY, coordZ])
-                        # just note: works only if initializing with solution
-                        # find clear head definition without simulation needed after testing
-
-
-                        # isnt this turning heads around, as the cell info can get to -1?
-
-                        # print('self.timeStep', self.timeStep)
-                        # print('debug [coordX, coordY, coordZ]', [coordX, coordY, coordZ])
-                        # print('debug [l-1, r-1, c-1]', [l-1, r-1, c-1], self.nLay, self.nRow, self.nCol)
-
-
-
-                        # resolution??? of mesh???
-
-                        # heads[count] = self.headsInitial[l-1, r-1, c-1]
-                        # print('debug len(heads)', len(heads))
-                        # print('debug count', count)
-                        # print('shape(self.headsInitial)', shape(self.headsInitial))
-                        # l = 0
-                        # can this ever be 1?
-                        # fixed layer temporarily
-                        heads[count] = self.headsInitial[l-1, r-1, c-1]
-                    count += 1
+        if pathJson not in surrogateModelsCache:
+            with open(pathJson) as json_file:
+                json_config = json_file.read()
+            model = model_from_json(json_config)
+            model.load_weights(pathJson.replace('.json', 'Weights.h5'))
+            surrogateModelsCache[pathJson] = model
+
+        return surrogateModelsCache[pathJson]
+
+    def loadSurrogateInterpreter(self, pathJson):
+        """Load surrogate model as TensorFlow Lite interpreter with dynamic
+        range quantized weights. The converted model is shared per process
+        and path, interpreters are not as they are not thread-safe.
+        """
+
+        if pathJson not in surrogateQuantizedCache:
+            converter = TFLiteConverter.from_keras_model(
+                self.loadSurrogateModelCached(pathJson))
+            converter.optimizations = [Optimize.DEFAULT]
+            surrogateQuantizedCache[pathJson] = converter.convert()
+        interpreter = Interpreter(
+            model_content=surrogateQuantizedCache[pathJson])
+        interpreter.allocate_tensors()
+
+        return interpreter
+
+    def predictCompiled(self, model, inputVector):
+        """Predict a single input vector through a compiled forward pass of
+        the given surrogate model, skipping overhead of Keras predict."""
+        if isinstance(model, Interpreter):
+            model.set_tensor(model.get_input_details()[0]['index'],
+                self.inputBatch(inputVector))
+            model.invoke()
+            return model.get_tensor(model.get_output_details()[0]['index'])
+        if model not in agentPredictsCache:
+            agentPredictsCache[model] = FloPyAgent.compilePredictFunction(
+                self, model)
+        return agentPredictsCache[model](
+            self.inputBatch(inputVector)).numpy()
+
+    def normalizeStresses(self):
+        """Normalize stresses of the current step as expected by the surrogate
+        models, scaling specified heads by the maximum head.
+        """
+
+        if self.ENVTYPE == '1':
+            headsStress = [self.actionValueSouth * self.invMaxH,
+                self.actionValueNorth * self.invMaxH]
+        elif self.ENVTYPE == '2':
+            headsStress = [self.actionValue]
+        elif self.ENVTYPE == '3':
+            headsStress = [self.headSpecSouth * self.invMaxH,
+                self.headSpecNorth * self.invMaxH]
+
+        return headsStress + [self.wellQ * self.invQ, self.wellX * self.invX,
+            self.wellY * self.invX, self.wellZ * self.invX]
+
+    def compileEnsemblePredictFunction(self, models, weights):
+        """Compile the weighted sum of ensemble member predictions into a
+        single inference graph, queried in one call instead of per member.
+        """
 
+        inputSignature = [TensorSpec(shape=[None, models[0].input_shape[-1]],
+            dtype=float32)]
+        weights = [float(weight) for weight in weights]
+
+        def predictEnsemble(x):
+            prediction = models[0](x, training=False) * weights[0]
+            for model, weight in zip(models[1:], weights[1:]):
+                prediction += model(x, training=False) * weight
+            return prediction
+
+        return tfFunction(predictEnsemble, input_signature=inputSignature)
+
+    def compileTransientPredictFunction(self, nInputsBefore, nHeads):
+        """Compile the heads and the subsequent particle prediction of a
+        transient step into a single inference graph.
+
+        The particle is predicted from the inputs of the heads prediction,
+        with the predicted heads inserted after the states and stresses
+        before. Given overriding heads replace predicted heads where not NaN.
+        Returns False if a surrogate model is a quantized interpreter.
+        """
+
+        if self.useBestEnsembleTransient:
+            predictHeads = self.models['UnweightedHeads_ensemblePredict']
+            predictParticle = self.models['UnweightedParticle_ensemblePredict']
+            transientKey = (predictHeads, predictParticle)
+        elif self.quantizeSurrogates:
+            return False
+        else:
+            modelHeads = self.modelTransientHeads
+            modelParticle = self.modelTransientParticle
+            predictHeads = lambda x: modelHeads(x, training=False)
+            predictParticle = lambda x: modelParticle(x, training=False)
+            transientKey = (modelHeads, modelParticle)
+        transientKey += (nInputsBefore, nHeads)
+        if transientKey in surrogateTransientPredictsCache:
+            return surrogateTransientPredictsCache[transientKey]
+
+        def predictTransient(x, headsOverride):
+            heads = predictHeads(x)
+            headsNow = tfWhere(tfIsNan(headsOverride), heads, headsOverride)
+            particle = predictParticle(tfConcat([x[:, :nInputsBefore],
+                headsNow, x[:, nInputsBefore:]], axis=1))
+            return heads, particle
+
+        inputSignature = [
+            TensorSpec(shape=[1, self.inputVectorHeads.shape[1]], dtype=float32),
+            TensorSpec(shape=[1, nHeads], dtype=float32)]
+        surrogateTransientPredictsCache[transientKey] = tfFunction(
+            predictTransient, input_signature=inputSignature)
+
+        return surrogateTransientPredictsCache[transientKey]
+
+    def inputBatch(self, inputVector):
+        """Return input vector as float32 batch of a single row, passing
+        inputs already prepared as such without reshaping.
+        """
+
+        inputVector = asarray(inputVector, dtype=float32)
+        if inputVector.ndim == 1:
+            inputVector = inputVector.reshape(1, -1)
+
+        return inputVector
+
+    def predictEnsembleCompiled(self, suffix, inputVector):
+        """Predict a single input vector as weighted sum of an ensemble."""
+        return self.models[suffix + '_ensemblePredict'](
+            self.inputBatch(inputVector)).numpy()
+
+    def surroundingHeadsFromCoordinates(self, surroundings, heads):
+        """Determine hydraulic head of surrounding cells, given as an array of
+        locations. Returns head of the same cell in the case of surrounding
+        edges of the environment domain.
+        """
+
+        # overwriting only heads of locations beyond the domain edges
+        adjustedCoords = ((surroundings[:, 0] > self.extentX) |
+            (surroundings[:, 0] < self.minX) |
+            (surroundings[:, 1] > self.extentY) |
+            (surroundings[:, 1] < self.minY))
+        if adjustedCoords.any():
+            clip(surroundings[:, 0], self.minX, self.extentX,
+                out=surroundings[:, 0])
+            clip(surroundings[:, 1], self.minY, self.extentY,
+                out=surroundings[:, 1])
+            layers, columns, rows = FloPyEnv.cellsFromCoordinates(self,
+                surroundings[adjustedCoords])
+            # just note: works only if initializing with solution
+            heads[adjustedCoords] = self.headsInitial[layers-1, rows-1,
+                columns-1]
 
         return heads
 
@@ -3128,13 +3675,10 @@ class FloPyEnvSurrogate():
 
     def reset(self, _seed=None, MODELNAME=None):
         """Reset environment with same settings but potentially new seed."""
-        self.__init__(
-            self.SURROGATESIMULATOR,
-            self.ENVTYPE,
-            self.MODELNAME if MODELNAME is None else MODELNAME,
-            _seed=_seed,
-            NGAGENTSTEPS=self.NAGENTSTEPS
-            )
+
+        if MODELNAME is not None:
+            self.MODELNAME = MODELNAME
+        self.initializeGame(_seed)
 
 
 class FloPyArcade():
@@ -3147,7 +3691,8 @@ class FloPyArcade():
         animationFolder=None, NAGENTSTEPS=200, PATHMF2005=None, PATHMP6=None,
         surrogateSimulator=None, flagSavePlot=False,
         flagManualControl=False, flagRender=False,
-        keepTimeSeries=False, nLay=1, nRow=100, nCol=100):
+        keepTimeSeries=False, nLay=1, nRow=100, nCol=100,
+        flagPrintResult=True):
         """Constructor."""
 
         self.PATHMF2005 = PATHMF2005
@@ -3157,6 +3702,7 @@ class FloPyArcade():
         self.SAVEPLOT = flagSavePlot
         self.MANUALCONTROL = flagManualControl
         self.RENDER = flagRender
+        self.PRINTRESULT = flagPrintResult
         self.MODELNAME = modelName if modelName is not None else modelNameLoad
         self.ANIMATIONFOLDER = animationFolder if modelName is not None else modelNameLoad
         self.agent = agent
@@ -3192,120 +3738,137 @@ class FloPyArcade():
 
         self.wrkspc = self.env.wrkspc
 
+        # binding to locals, as attribute lookups add up in the game loop
+        env, keepTimeSeries = self.env, self.keepTimeSeries
+        envStep = env.step
+
         # self.env.stepInitial()
-        observations, self.done = self.env.observationsVectorNormalizedHeads, self.env.done
-        if self.keepTimeSeries:
-            # collecting time series of game metrices
-            statesNormalized, stressesNormalized = [], []
-            rewards, doneFlags, successFlags = [], [], []
-            heads, headsFullField, actions, wellCoords, trajectories = [], [], [], [], []
-            statesNormalized.append(observations)
-            rewards.append(0.)
-            doneFlags.append(self.done)
-            successFlags.append(-1)
-            heads.append(self.env.heads)
-            headsFullField.append(self.env.state['heads'])
-            wellCoords.append(self.env.wellCoords)
-
-        self.actionRange, self.actionSpace = self.env.actionRange, self.env.actionSpace
+        observations, self.done = env.observationsVectorNormalizedHeads, env.done
+        if keepTimeSeries:
+            # collecting time series of game metrices, preallocated as the
+            # number of steps is bounded, with states including the initial
+            # single precision suffices, as heads are simulated as such
+            nSteps = self.NAGENTSTEPS + 1
+            statesNormalized = empty((nSteps,) + shape(observations),
+                dtype=float32)
+            stressesNormalized = empty((nSteps-1,
+                len(env.stressesVectorNormalized)), dtype=float32)
+            rewards = zeros(nSteps, dtype=float32)
+            doneFlags = zeros(nSteps, dtype=bool)
+            successFlags = full(nSteps, -1, dtype=int8)
+            heads = empty((nSteps,) + shape(env.heads), dtype=float32)
+            headsFullField = empty((nSteps,) + shape(env.state['heads']),
+                dtype=float32)
+            wellCoords = empty((nSteps, len(env.wellCoords)), dtype=float32)
+            actions = empty(nSteps-1, dtype=object)
+            statesNormalized[0] = observations
+            doneFlags[0] = self.done
+            heads[0] = env.heads
+            headsFullField[0] = env.state['heads']
+            wellCoords[0] = env.wellCoords
+            nStepsRecorded = 0
+
+        self.actionRange, self.actionSpace = env.actionRange, env.actionSpace
         agent = FloPyAgent(actionSpace=self.actionSpace)
+        getAction = agent.getAction
+
+        # loading a stored agent model once, instead of at every step
+        agentModel = self.agent
+        if self.MODELNAMELOAD is not None:
+            agentModel = agent.loadAgentModel(self.MODELNAMELOAD)
 
         # game loop
         self.success = False
-        self.rewardTotal = 0.
+        rewardTotal = 0.
 
         for self.timeSteps in range(self.NAGENTSTEPS):
-            if not self.done:
-                # without user control input: generating random agent action
-                t0getAction = time()
-                if self.MANUALCONTROL:
-                    action = agent.getAction('manual', self.env.keyPressed)
-                elif self.MANUALCONTROL == False:
-                    if self.MODELNAMELOAD is None and self.agent is None:
-                        action = agent.getAction('random')
-                    elif self.MODELNAMELOAD is not None:
-                        action = agent.getAction(
-                            'modelNameLoad',
-                            modelNameLoad=self.MODELNAMELOAD,
-                            state=self.env.observationsVectorNormalized
-                            )
-                    elif self.agent is not None:
-                        action = agent.getAction(
-                            'model',
-                            agent=self.agent,
-                            state=self.env.observationsVectorNormalized
-                            )
-
-                # print('debug time getAction', time() - t0getAction)
-                # print('debug action', action)
-
-                t0step = time()
-                observations, reward, self.done, _ = self.env.step(
-                    # self.env.observationsVector, action, self.rewardTotal)
-                    self.env.observationsVectorNormalized, action, self.rewardTotal)
-                # print('debug time step', time() - t0step)
-
-                if self.keepTimeSeries:
-                    # collecting time series of game metrices
-                    statesNormalized.append(self.env.observationsVectorNormalizedHeads)
-                    stressesNormalized.append(self.env.stressesVectorNormalized)
-                    rewards.append(reward)
-                    heads.append(self.env.heads)
-                    headsFullField.append(self.env.state['heads'])
-                    doneFlags.append(self.done)
-                    wellCoords.append(self.env.wellCoords)
-                    actions.append(action)
-                    if not self.done:
-                        successFlags.append(-1)
-                    if self.done:
-                        if self.env.success:
-                            successFlags.append(1)
-                        elif not self.env.success:
-                            successFlags.append(0)
-                self.rewardTotal += reward
-
-            if self.done or self.timeSteps == self.NAGENTSTEPS-1:
-
-                if self.MANUALCONTROL:
-                    # freezing screen shortly when game is done
-                    sleep(5)
-
-                if self.keepTimeSeries:
-                    self.timeSeries = {}
-                    self.timeSeries['statesNormalized'] = statesNormalized
-                    self.timeSeries['stressesNormalized'] = stressesNormalized
-                    self.timeSeries['rewards'] = rewards
-                    self.timeSeries['doneFlags'] = doneFlags
-                    self.timeSeries['successFlags'] = successFlags
-                    self.timeSeries['heads'] = heads
-                    self.timeSeries['headsFullField'] = headsFullField
-                    self.timeSeries['wellCoords'] = wellCoords
-                    self.timeSeries['actions'] = actions
-                    self.timeSeries['trajectories'] = self.env.trajectories
-
-                self.success = self.env.success
-                if self.env.success:
-                    successString = 'won'
-                elif self.env.success == False:
-                    successString = 'lost'
-                    # total loss of reward if entering well protection zone
-                    self.rewardTotal = 0.0
-
-                if self.SURROGATESIMULATOR is not None:
-                    stringSurrogate = 'surrogate '
-                    # print('surrogate')
+            if self.done:
+                # environment concluded before, as when reused
+                break
+
+            # without user control input: generating random agent action
+            if self.MANUALCONTROL:
+                action = getAction('manual', env.keyPressed)
+            elif self.MANUALCONTROL == False:
+                if agentModel is None:
+                    action = getAction('random')
                 else:
-                    stringSurrogate = ''
-                    # print('not surrogate')
-                print('The ' + stringSurrogate + 'game was ' +
-                      successString +
-                      ' after ' +
-                      str(self.timeSteps) +
-                      ' timesteps with a reward of ' +
-                      str(int(self.rewardTotal)) +
-                      ' points.')
-                close('all')
+                    action = getAction(
+                        'model',
+                        agent=agentModel,
+                        state=env.observationsVectorNormalized
+                        )
+
+            # print('debug action', action)
+
+            observations, reward, self.done, _ = envStep(
+                # env.observationsVector, action, rewardTotal)
+                env.observationsVectorNormalized, action, rewardTotal)
+
+            if keepTimeSeries:
+                # collecting time series of game metrices
+                stressesNormalized[nStepsRecorded] = env.stressesVectorNormalized
+                actions[nStepsRecorded] = action
+                nStepsRecorded += 1
+                statesNormalized[nStepsRecorded] = env.observationsVectorNormalizedHeads
+                rewards[nStepsRecorded] = reward
+                heads[nStepsRecorded] = env.heads
+                headsFullField[nStepsRecorded] = env.state['heads']
+                doneFlags[nStepsRecorded] = self.done
+                wellCoords[nStepsRecorded] = env.wellCoords
+                if self.done:
+                    successFlags[nStepsRecorded] = 1 if env.success else 0
+            rewardTotal += reward
+            if self.done:
                 break
 
+        # concluding the game, once done or out of steps
+        if self.MANUALCONTROL:
+            # freezing screen shortly when game is done
+            sleep(5)
+
+        if keepTimeSeries:
+            # truncating to the steps played
+            nStates = nStepsRecorded + 1
+            self.timeSeries = {}
+            self.timeSeries['statesNormalized'] = statesNormalized[:nStates]
+            self.timeSeries['stressesNormalized'] = stressesNormalized[:nStepsRecorded]
+            self.timeSeries['rewards'] = rewards[:nStates]
+            self.timeSeries['doneFlags'] = doneFlags[:nStates]
+            self.timeSeries['successFlags'] = successFlags[:nStates]
+            self.timeSeries['heads'] = heads[:nStates]
+            self.timeSeries['headsFullField'] = headsFullField[:nStates]
+            self.timeSeries['wellCoords'] = wellCoords[:nStates]
+            self.timeSeries['actions'] = actions[:nStepsRecorded]
+            self.timeSeries['trajectories'] = env.trajectories
+
+        self.success = env.success
+        if env.success:
+            successString = 'won'
+        elif env.success == False:
+            successString = 'lost'
+            # total loss of reward if entering well protection zone
+            rewardTotal = 0.0
+
+        if self.PRINTRESULT:
+            # can be disabled, as printing stalls mass rollouts
+            if self.SURROGATESIMULATOR is not None:
+                stringSurrogate = 'surrogate '
+                # print('surrogate')
+            else:
+                stringSurrogate = ''
+                # print('not surrogate')
+            print('The ' + stringSurrogate + 'game was ' +
+                  successString +
+                  ' after ' +
+                  str(self.timeSteps) +
+                  ' timesteps with a reward of ' +
+                  str(int(rewardTotal)) +
+                  ' points.')
+        if self.MANUALCONTROL or self.RENDER or self.SAVEPLOT:
+            # figures only exist if the game was displayed
+            close('all')
+
+        self.rewardTotal = rewardTotal
         self.gamesPlayed = self.timeSteps
         self.runtime = (time() - t0) / 60.
\ No newline at end of file
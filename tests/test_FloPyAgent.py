@@ -0,0 +1,36 @@
+from os.path import abspath, dirname
+from sys import path
+
+import pytest
+
+path.insert(0, dirname(dirname(abspath(__file__))))
+FloPyArcade = pytest.importorskip('FloPyArcade')
+numpy = pytest.importorskip('numpy')
+
+
+def test_replay_memory_zero_reward_of_last_game():
+    """Zero rewards only of the transitions stored by the last game, which
+    wraps around the end of the replay memory.
+    """
+
+    agent = FloPyArcade.FloPyAgent.__new__(FloPyArcade.FloPyAgent)
+    nMemory, nObservations = 6, 2
+    agent.replayStates = numpy.zeros((nMemory, nObservations),
+        dtype=numpy.float32)
+    agent.replayActions = numpy.zeros(nMemory, dtype=numpy.int32)
+    agent.replayRewards = numpy.zeros(nMemory, dtype=numpy.float32)
+    agent.replayNewStates = numpy.zeros((nMemory, nObservations),
+        dtype=numpy.float32)
+    agent.replayDones = numpy.zeros(nMemory, dtype=bool)
+    agent.replayMemoryCursor, agent.replayMemoryCount = 2, 0
+
+    state = numpy.zeros(nObservations, dtype=numpy.float32)
+    # first game with rewards 1 to 3, second game with rewards 4 to 6
+    for reward in [1., 2., 3.]:
+        agent.updateReplayMemory([state, 0, reward, state, reward == 3.])
+    for reward in [4., 5., 6.]:
+        agent.updateReplayMemory([state, 0, reward, state, reward == 6.])
+    agent.updateReplayMemoryZeroReward(3)
+
+    assert sorted(agent.replayRewards.tolist()) == [0., 0., 0., 1., 2., 3.]
+    assert agent.replayMemoryCount == nMemory
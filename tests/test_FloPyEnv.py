@@ -0,0 +1,28 @@
+from os.path import abspath, dirname, exists, join
+from sys import path
+
+import pytest
+
+path.insert(0, dirname(dirname(abspath(__file__))))
+FloPyArcade = pytest.importorskip('FloPyArcade')
+pathSimulators = join(dirname(abspath(FloPyArcade.__file__)), 'simulators')
+
+
+@pytest.mark.skipif(not (exists(join(pathSimulators, 'mf2005')) and
+    exists(join(pathSimulators, 'mp6'))),
+    reason='MODFLOW and MODPATH executables are not in simulators')
+def test_transient_steps():
+    """Play several transient steps, each replacing the BAS6 and WEL packages
+    of the persisting model.
+    """
+
+    env = FloPyArcade.FloPyEnv(ENVTYPE='3', MODELNAME='FloPyArcadeTest',
+        _seed=1, NAGENTSTEPS=3)
+    for _ in range(3):
+        if env.done:
+            break
+        env.step(env.observationsVectorNormalized, 'keep', env.reward)
+        packages = [package.name[0] for package in env.mf.packagelist]
+        assert packages.count('BAS6') == 1
+        assert packages.count('WEL') == 1
+    assert env.timeStep >= 2